@@ -1,16 +1,26 @@
+from functools import partial
+import numpy as np
 from modules.preprocessor import TextPreprocessor
 from modules.keyword_extractor import KeywordExtractor
+from modules.enhanced_keyword_extractor import EnhancedKeywordExtractor
 from modules.comparator import AnswerComparator
 from modules.science_vocabulary import ScienceVocabularyBuilder
+from modules.calibration import ScoringProfile, FEATURE_NAMES
+from modules.textbook_index import TextbookIndex
+from modules.regrader import IncrementalRegrader
+from modules.term_dictionary import TermDictionary
+from modules.passage_retriever import PassageIndex
+from modules.stage_costs import StageCostModel, DeadlineTracker
 
 class AnswerEvaluator:
     """
     Complete system to evaluate student answers
     """
     
-    def __init__(self, vocabulary_file="trained_data/science_vocabulary.json"):
+    def __init__(self, vocabulary_file="trained_data/science_vocabulary.json",
+                 profile_file="trained_data/scoring_profile.json", subject_boost=False,
+                 index_dir="trained_data/textbook_index", passage_index_dir="trained_data/passage_index"):
         self.preprocessor = TextPreprocessor()
-        self.keyword_extractor = KeywordExtractor(max_keywords=15)
         self.comparator = AnswerComparator()
         self.vocab_builder = ScienceVocabularyBuilder()
         
@@ -19,76 +29,287 @@ class AnswerEvaluator:
             print("✓ Loaded textbook vocabulary")
         else:
             print("⚠ Running without textbook vocabulary")
+        
+        # Shared term ids used by every stage after preprocessing
+        self.term_dictionary = TermDictionary.from_vocabulary(self.vocab_builder)
+        
+        # Optionally boost keywords that are frequent in the subject's textbook
+        self.subject_boost = subject_boost
+        if subject_boost:
+            self.keyword_extractor = EnhancedKeywordExtractor(max_keywords=15, vocab_builder=self.vocab_builder)
+        else:
+            self.keyword_extractor = KeywordExtractor(max_keywords=15)
+        
+        # Learned per-stage timings for time-budgeted evaluation. Batches
+        # amortise setup over many answers, so their per-answer costs are
+        # learned separately from single answers
+        self.stage_costs = StageCostModel()
+        self.batch_stage_costs = StageCostModel()
+        
+        # Load calibrated scoring weights (defaults: 60% similarity + 40% keywords)
+        self.profile = ScoringProfile()
+        if self.profile.load(profile_file):
+            print("✓ Loaded calibrated scoring profile")
+        
+        # Load textbook page index (built by train_on_textbooks.py)
+        self.textbook_index = TextbookIndex()
+        if self.textbook_index.load(index_dir):
+            print("✓ Loaded textbook page index")
+        else:
+            self.textbook_index = None
+        
+        # Load textbook passage index for model answer suggestions
+        self.passage_index = PassageIndex()
+        if self.passage_index.load(passage_index_dir):
+            print("✓ Loaded textbook passage index")
+        else:
+            self.passage_index = None
     
-    def evaluate_answer(self, model_answer, student_answer, subject="general", max_marks=10):
+    def extract_keyword_ids(self, ids, subject="general"):
         """
-        Evaluate a student answer against model answer
+        Keywords of a term-id array
+        Returns: (keyword ids, scores)
+        """
+        return self.extract_keyword_ids_batch([ids], subject)[0]
+    
+    def extract_keyword_ids_batch(self, id_arrays, subject="general"):
+        """
+        Keywords of many term-id arrays (subject boosts applied once per batch)
+        Returns: list of (keyword ids, scores)
+        """
+        if self.subject_boost:
+            return self.keyword_extractor.extract_keyword_ids_with_boost_batch(
+                id_arrays, self.term_dictionary, subject, top_n=10)
+        return self.keyword_extractor.extract_keyword_ids_batch(id_arrays, self.term_dictionary, top_n=10)
+    
+    def prepare_answer(self, answer, subject="general"):
+        """
+        Preprocess an answer to term ids and extract its keywords
+        Returns: (token ids, keyword ids, keyword scores)
+        """
+        ids = self.preprocessor.preprocess_to_ids(answer, self.term_dictionary)
+        keyword_ids, keyword_scores = self.extract_keyword_ids(ids, subject)
+        return ids, keyword_ids, keyword_scores
+    
+    def encode_keywords(self, keywords):
+        """
+        Teacher- or retrieval-supplied keywords as unique term ids
+        """
+        ids = self.preprocessor.preprocess_to_ids(" ".join(keywords), self.term_dictionary)
+        _, first = np.unique(ids, return_index=True)
+        return ids[np.sort(first)]
+    
+    def suggest_model_answer(self, question, top_k=3, top_n=10):
+        """
+        Suggest a model answer and keywords from textbook passages
         
         Returns:
-            dict with score, feedback, matched_keywords, missing_keywords
+            dict with passages (book, page, score, text), model_answer
+            (the passages joined) and keywords for evaluate_answer's
+            model_keywords
         """
-        print("\n" + "="*70)
-        print("EVALUATING ANSWER")
-        print("="*70)
+        if self.passage_index is None:
+            print("⚠ No passage index found. Run train_on_textbooks.py first.")
+            return {"passages": [], "model_answer": "", "keywords": []}
         
-        # Preprocess both answers
-        model_cleaned = self.preprocessor.preprocess_to_text(model_answer)
-        student_cleaned = self.preprocessor.preprocess_to_text(student_answer)
+        suggestion = self.passage_index.suggest(question, top_k, top_n)
+        suggestion["model_answer"] = "\n\n".join(p["text"] for p in suggestion["passages"])
+        return suggestion
+    
+    def compute_features(self, model_ids, student_ids, model_keyword_ids, student_keyword_ids, subject="general",
+                         include_similarity=True):
+        """
+        Compute the scoring features for one answer pair of term-id arrays
+        (similarity is 0 when include_similarity is False)
         
-        # Extract keywords from both
-        model_keywords = self.keyword_extractor.extract_keywords(model_cleaned, top_n=10)
-        student_keywords = self.keyword_extractor.extract_keywords(student_cleaned, top_n=10)
+        Returns:
+            dict with similarity, keyword_match, textbook_coverage, length
+            (each 0 to 1) plus matched and missing keyword id arrays
+        """
+        similarity = 0.0
+        if include_similarity:
+            similarity = self.comparator.calculate_similarity_ids(model_ids, student_ids, self.term_dictionary)
+        matched, missing = self.comparator.find_matched_keyword_ids(model_keyword_ids, student_keyword_ids)
         
-        print("\nMODEL ANSWER KEYWORDS:")
-        for word, score in model_keywords:
-            is_textbook_term = self.vocab_builder.check_if_science_term(word, subject)
-            marker = "📘" if is_textbook_term else "  "
-            print(f"  {marker} {word}: {score:.3f}")
+        keyword_match_ratio = len(matched) / len(model_keyword_ids) if len(model_keyword_ids) else 0
         
-        print("\nSTUDENT ANSWER KEYWORDS:")
-        for word, score in student_keywords:
-            is_textbook_term = self.vocab_builder.check_if_science_term(word, subject)
-            marker = "📘" if is_textbook_term else "  "
-            print(f"  {marker} {word}: {score:.3f}")
+        # Share of the model's textbook terms the student also used
+        textbook_terms = model_keyword_ids[self.term_dictionary.subject_mask(self.vocab_builder, subject)[model_keyword_ids]]
+        if len(textbook_terms):
+            textbook_coverage = np.isin(textbook_terms, matched).sum() / len(textbook_terms)
+        else:
+            textbook_coverage = keyword_match_ratio
         
-        # Calculate similarity
-        similarity = self.comparator.calculate_similarity(model_cleaned, student_cleaned)
+        model_length = len(model_ids)
+        length_ratio = min(len(student_ids) / model_length, 1.0) if model_length else 0
         
-        # Find matched and missing keywords
-        matched, missing = self.comparator.find_matched_keywords(model_keywords, student_keywords)
+        return {
+            "similarity": similarity,
+            "keyword_match": keyword_match_ratio,
+            "textbook_coverage": textbook_coverage,
+            "length": length_ratio,
+            "matched": matched,
+            "missing": missing,
+        }
+    
+    def find_study_pages(self, keywords, subject="general", max_pages=3):
+        """
+        Textbook pages explaining each keyword
+        Pages come from the subject's own book when it is indexed
+        (book names are subject names), otherwise from every book
+        Returns: dict of keyword -> list of (book, page) tuples
+        """
+        if self.textbook_index is None:
+            return {}
+        
+        book = subject if subject in self.textbook_index.books else None
+        study_pages = {}
+        for word in keywords:
+            pages = self.textbook_index.find_pages(word, max_pages, book)
+            if pages:
+                study_pages[word] = pages
+        return study_pages
+    
+    def evaluate_answer(self, model_answer, student_answer, subject="general", max_marks=10, model_keywords=None,
+                        time_budget=None, verbose=True):
+        """
+        Evaluate a student answer against model answer
+        
+        model_keywords: optional list of keywords to use instead of those
+        extracted from the model answer (e.g. from suggest_model_answer)
+        time_budget: optional seconds allowed. Stages run cheapest-first
+        (keywords, similarity, study pages) while the learned cost model
+        says they fit; skipped stages are left out of the score.
+        
+        Returns:
+            dict with score, feedback, matched_keywords, missing_keywords,
+            stages_run and degraded (True if any stage was skipped)
+        """
+        tracker = DeadlineTracker(self.stage_costs, time_budget)
+        
+        if verbose:
+            print("\n" + "="*70)
+            print("EVALUATING ANSWER")
+            print("="*70)
+        
+        with tracker.run("keywords"):
+            # Preprocess both answers to term ids and extract their keywords
+            model_ids, model_keyword_ids, model_scores = self.prepare_answer(model_answer, subject)
+            student_ids, student_keyword_ids, student_scores = self.prepare_answer(student_answer, subject)
+            if model_keywords is not None:
+                model_keyword_ids = self.encode_keywords(model_keywords)
+                model_scores = np.ones(len(model_keyword_ids))
+            
+            # Keyword match and the other cheap scoring features
+            features = self.compute_features(model_ids, student_ids, model_keyword_ids, student_keyword_ids,
+                                             subject, include_similarity=False)
+        
+        if verbose:
+            textbook_mask = self.term_dictionary.subject_mask(self.vocab_builder, subject)
+            
+            print("\nMODEL ANSWER KEYWORDS:")
+            for term_id, score in zip(model_keyword_ids, model_scores):
+                marker = "📘" if textbook_mask[term_id] else "  "
+                print(f"  {marker} {self.term_dictionary.terms[term_id]}: {score:.3f}")
+            
+            print("\nSTUDENT ANSWER KEYWORDS:")
+            for term_id, score in zip(student_keyword_ids, student_scores):
+                marker = "📘" if textbook_mask[term_id] else "  "
+                print(f"  {marker} {self.term_dictionary.terms[term_id]}: {score:.3f}")
+        
+        # Calculate similarity
+        similarity = None
+        if tracker.should_run("similarity"):
+            with tracker.run("similarity"):
+                similarity = self.comparator.calculate_similarity_ids(model_ids, student_ids, self.term_dictionary)
+                features["similarity"] = similarity
         
-        # Calculate score
-        keyword_match_ratio = len(matched) / len(model_keywords) if model_keywords else 0
+        keyword_match_ratio = features["keyword_match"]
+        matched = self.term_dictionary.decode(features["matched"])
+        missing = self.term_dictionary.decode(features["missing"])
         
-        # Weighted scoring: 60% similarity + 40% keyword match
-        final_score_ratio = (similarity * 0.6) + (keyword_match_ratio * 0.4)
+        # Weighted scoring using the (calibrated) profile weights
+        available = [name for name in FEATURE_NAMES if name != "similarity" or similarity is not None]
+        final_score_ratio = self.profile.combine(features, available)
         final_score = round(final_score_ratio * max_marks, 2)
         
+        # Point the student to textbook pages for missing concepts
+        study_pages = {}
+        if tracker.should_run("study_pages"):
+            with tracker.run("study_pages"):
+                study_pages = self.find_study_pages(missing, subject)
+        
         # Generate feedback
-        feedback = self._generate_feedback(final_score_ratio, matched, missing, max_marks)
+        feedback = self._generate_feedback(final_score_ratio, matched, missing, max_marks, study_pages)
         
         result = {
             "score": final_score,
             "max_marks": max_marks,
             "percentage": round(final_score_ratio * 100, 1),
-            "similarity": round(similarity * 100, 1),
+            "similarity": round(similarity * 100, 1) if similarity is not None else None,
             "keyword_match": round(keyword_match_ratio * 100, 1),
             "matched_keywords": matched,
             "missing_keywords": missing,
-            "feedback": feedback
+            "study_pages": study_pages,
+            "feedback": feedback,
+            "stages_run": tracker.stages_run,
+            "degraded": tracker.degraded
         }
         
         return result
     
-    def _generate_feedback(self, score_ratio, matched, missing, max_marks):
+    def evaluate_batch(self, model_answer, student_answers, subject="general", max_marks=10, student_ids=None,
+                       model_keywords=None, time_budget=None):
+        """
+        Evaluate many student answers against one model answer
+        
+        The model answer is processed once and all students are scored
+        together. Feedback, including study pages, is rendered only when a
+        row is accessed.
+        time_budget: optional seconds for the whole batch, applied to the
+        keyword and similarity stages as in evaluate_answer, using batch
+        timings (study pages are looked up on access, outside the budget)
+        
+        Returns:
+            ResultTable (one row per student, in input order)
+        Raises ValueError if student_ids and student_answers differ in
+        length or a student id repeats
+        """
+        if student_ids is None:
+            student_ids = list(range(len(student_answers)))
+        
+        tracker = DeadlineTracker(self.batch_stage_costs, time_budget, n_items=max(len(student_answers), 1),
+                                  stages=["keywords", "similarity"])
+        
+        with tracker.run("keywords"):
+            regrader = IncrementalRegrader(self, model_answer, subject, max_marks, model_keywords)
+            regrader.add_students(student_ids, student_answers)
+            regrader.grade(include_similarity=False)
+        
+        if tracker.should_run("similarity"):
+            with tracker.run("similarity"):
+                similarity = regrader.compute_similarity()
+            regrader.add_similarity(similarity)
+        
+        results = regrader.results(feedback_renderer=partial(self.render_feedback, subject=subject))
+        results.stages_run = tracker.stages_run
+        return results
+    
+    def render_feedback(self, score_ratio, matched, missing, max_marks, subject="general"):
+        """Feedback text including textbook pages for missing keywords"""
+        study_pages = self.find_study_pages(missing, subject)
+        return self._generate_feedback(score_ratio, matched, missing, max_marks, study_pages)
+    
+    def _generate_feedback(self, score_ratio, matched, missing, max_marks, study_pages=None):
         """Generate detailed feedback for student"""
         feedback = []
+        excellent, good, average = self.profile.thresholds
         
-        if score_ratio >= 0.8:
+        if score_ratio >= excellent:
             feedback.append("✅ Excellent answer! All key concepts covered.")
-        elif score_ratio >= 0.6:
+        elif score_ratio >= good:
             feedback.append("✓ Good answer. Most key concepts present.")
-        elif score_ratio >= 0.4:
+        elif score_ratio >= average:
             feedback.append("⚠ Average answer. Some important concepts missing.")
         else:
             feedback.append("❌ Needs improvement. Many key concepts missing.")
@@ -100,6 +321,12 @@ class AnswerEvaluator:
             feedback.append(f"\n✗ Missing keywords: {', '.join(missing)}")
             feedback.append(f"  → Focus on these concepts to improve your answer.")
         
+        if study_pages:
+            feedback.append("\n📖 Where to study:")
+            for word, pages in study_pages.items():
+                refs = ", ".join(f"{book} p.{page}" for book, page in pages)
+                feedback.append(f"  • {word}: {refs}")
+        
         return "\n".join(feedback)
     
     def print_result(self, result):
@@ -109,8 +336,13 @@ class AnswerEvaluator:
         print("="*70)
         print(f"\n📊 SCORE: {result['score']}/{result['max_marks']} ({result['percentage']}%)")
         print(f"\n📈 METRICS:")
-        print(f"   • Overall Similarity: {result['similarity']}%")
+        if result['similarity'] is not None:
+            print(f"   • Overall Similarity: {result['similarity']}%")
+        else:
+            print(f"   • Overall Similarity: skipped (time budget)")
         print(f"   • Keyword Match: {result['keyword_match']}%")
+        if result.get('degraded'):
+            print(f"   • Stages run: {', '.join(result['stages_run'])}")
         print(f"\n💬 FEEDBACK:")
         print(result['feedback'])
         print("\n" + "="*70)
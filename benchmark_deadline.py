@@ -0,0 +1,61 @@
+import sys
+import time
+import numpy as np
+from answer_evaluator import AnswerEvaluator
+from modules.calibration import WeightCalibrator
+from modules.stage_costs import STAGES
+
+BUDGETS_MS = [None, 50, 5, 1, 0.1]
+
+def run_budget(evaluator, answers, budget_ms):
+    """Evaluate every answer under one budget; returns latencies, scores and stages run"""
+    time_budget = None if budget_ms is None else budget_ms / 1000
+    latencies, scores, stages = [], [], []
+    for _, row in answers.iterrows():
+        started = time.perf_counter()
+        result = evaluator.evaluate_answer(
+            row["model_answer"], row["student_answer"], row["subject"],
+            row["max_marks"], time_budget=time_budget, verbose=False,
+        )
+        latencies.append(time.perf_counter() - started)
+        scores.append(result["percentage"])
+        stages.append(result["stages_run"])
+    return np.array(latencies) * 1000, np.array(scores), stages
+
+def benchmark_deadline(answers_file):
+    """Latency and score drift of evaluate_answer under shrinking time budgets"""
+    print("="*70)
+    print("DEADLINE BENCHMARK")
+    print("="*70)
+
+    evaluator = AnswerEvaluator()
+    try:
+        answers = WeightCalibrator(evaluator).load_marked_answers(answers_file)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    # Warm up the caches and the stage cost model
+    run_budget(evaluator, answers, None)
+    _, full_scores, _ = run_budget(evaluator, answers, None)
+
+    print(f"\n{'budget':>8} {'p50 ms':>8} {'p95 ms':>8} " + " ".join(f"{s:>12}" for s in STAGES) + f" {'score diff':>11}")
+    for budget_ms in BUDGETS_MS:
+        latencies, scores, stages = run_budget(evaluator, answers, budget_ms)
+        run_rates = [np.mean([stage in run for run in stages]) * 100 for stage in STAGES]
+        label = "none" if budget_ms is None else f"{budget_ms}ms"
+        print(f"{label:>8} {np.percentile(latencies, 50):8.2f} {np.percentile(latencies, 95):8.2f} "
+              + " ".join(f"{rate:11.0f}%" for rate in run_rates)
+              + f" {np.mean(np.abs(scores - full_scores)):10.1f}%")
+
+    print("\nLearned per-answer stage costs:")
+    for stage in STAGES:
+        print(f"   • {stage}: {evaluator.stage_costs.predict(stage) * 1000:.3f} ms")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python benchmark_deadline.py marked_answers.csv")
+        print("\nCSV columns: model_answer, student_answer, teacher_marks, max_marks, subject (optional)")
+        sys.exit(1)
+
+    benchmark_deadline(sys.argv[1])
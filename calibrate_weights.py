@@ -0,0 +1,34 @@
+import sys
+from answer_evaluator import AnswerEvaluator
+from modules.calibration import WeightCalibrator
+
+def calibrate_weights(marked_file, profile_file="trained_data/scoring_profile.json"):
+    """Fit scoring weights to teacher-marked answers and save the profile"""
+    print("="*70)
+    print("CALIBRATING SCORING WEIGHTS")
+    print("="*70)
+    
+    evaluator = AnswerEvaluator()
+    calibrator = WeightCalibrator(evaluator)
+    
+    try:
+        marked_answers = calibrator.load_marked_answers(marked_file)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    
+    profile = calibrator.calibrate(marked_answers)
+    profile.save(profile_file)
+    
+    print("\n" + "="*70)
+    print("✅ CALIBRATION COMPLETE!")
+    print("="*70)
+    print("The evaluator will load this profile automatically.")
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python calibrate_weights.py marked_answers.csv [profile.json]")
+        print("\nCSV columns: model_answer, student_answer, teacher_marks, max_marks, subject (optional)")
+        sys.exit(1)
+    
+    calibrate_weights(*sys.argv[1:3])
@@ -0,0 +1,17 @@
+# At the repository root so plain `pytest` puts the project on sys.path
+# and tests can import `modules` and `answer_evaluator`
+import pytest
+
+
+@pytest.fixture(scope="session")
+def preprocessor():
+    """
+    TextPreprocessor, or skip when the NLTK data is not installed
+    """
+    from modules.preprocessor import TextPreprocessor
+    try:
+        preprocessor = TextPreprocessor()
+        preprocessor.preprocess("Plants make glucose.")
+    except LookupError:
+        pytest.skip("NLTK data not installed (run setup_nltk.py)")
+    return preprocessor
@@ -0,0 +1,68 @@
+import argparse
+import os
+import sys
+from modules.sharding import load_exam, grade_shard, merge_shards, class_analytics
+
+def check_num_shards(args):
+    if args.num_shards < 1:
+        print("❌ --num-shards must be at least 1")
+        sys.exit(1)
+
+def grade(args):
+    """Grade one shard of the exam"""
+    from answer_evaluator import AnswerEvaluator
+
+    check_num_shards(args)
+    if not 0 <= args.shard < args.num_shards:
+        print(f"❌ --shard must be between 0 and {args.num_shards - 1}")
+        sys.exit(1)
+
+    try:
+        questions, answers = load_exam(args.questions, args.answers)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    evaluator = AnswerEvaluator(subject_boost=args.subject_boost)
+    grade_shard(evaluator, questions, answers, args.shard, args.num_shards, args.output_dir)
+
+def merge(args):
+    """Merge finished shards into final results and class analytics"""
+    check_num_shards(args)
+    try:
+        results = merge_shards(args.output_dir, args.num_shards)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    results_file = os.path.join(args.output_dir, "results.csv")
+    analytics_file = os.path.join(args.output_dir, "class_analytics.csv")
+
+    results.to_csv(results_file, index=False)
+    class_analytics(results, pass_percentage=args.pass_percentage).to_csv(analytics_file, index=False)
+
+    print(f"✓ Merged {len(results)} results from {args.num_shards} shard(s)")
+    print(f"✓ Results saved to: {results_file}")
+    print(f"✓ Class analytics saved to: {analytics_file}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Grade an exam in independent shards")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    grade_parser = commands.add_parser("grade", help="grade one shard")
+    grade_parser.add_argument("--questions", required=True, help="CSV: question_id, model_answer, subject, max_marks")
+    grade_parser.add_argument("--answers", required=True, help="CSV: question_id, student_id, student_answer")
+    grade_parser.add_argument("--shard", type=int, required=True, help="shard number, 0-based")
+    grade_parser.add_argument("--num-shards", type=int, required=True)
+    grade_parser.add_argument("--output-dir", required=True, help="shared directory for shard outputs")
+    grade_parser.add_argument("--subject-boost", action="store_true", help="boost textbook keywords")
+    grade_parser.set_defaults(run=grade)
+
+    merge_parser = commands.add_parser("merge", help="merge finished shards")
+    merge_parser.add_argument("--num-shards", type=int, required=True)
+    merge_parser.add_argument("--output-dir", required=True)
+    merge_parser.add_argument("--pass-percentage", type=float, default=40)
+    merge_parser.set_defaults(run=merge)
+
+    args = parser.parse_args()
+    args.run(args)
@@ -0,0 +1,226 @@
+import json
+import os
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+# Order of the columns in every feature matrix / weight vector
+FEATURE_NAMES = ["similarity", "keyword_match", "textbook_coverage", "length"]
+
+DEFAULT_WEIGHTS = {
+    "similarity": 0.6,
+    "keyword_match": 0.4,
+    "textbook_coverage": 0.0,
+    "length": 0.0,
+}
+
+# Score ratios for Excellent / Good / Average feedback
+DEFAULT_THRESHOLDS = [0.8, 0.6, 0.4]
+
+# Required columns of a teacher-marked answers CSV
+MARKED_COLUMNS = ["model_answer", "student_answer", "teacher_marks", "max_marks"]
+
+
+class ScoringProfile:
+    """
+    Blend weights and feedback thresholds used by the evaluator
+    """
+
+    def __init__(self, weights=None, thresholds=None):
+        self.weights = dict(DEFAULT_WEIGHTS)
+        if weights:
+            self.weights.update(weights)
+        self.thresholds = list(thresholds) if thresholds else list(DEFAULT_THRESHOLDS)
+
+    def weights_for(self, available=FEATURE_NAMES):
+        """
+        Weights rescaled over the features that were actually computed
+        (e.g. when similarity was skipped to meet a time budget)
+        """
+        if set(FEATURE_NAMES) <= set(available):
+            return self.weights
+
+        weights = {name: (self.weights[name] if name in available else 0.0) for name in FEATURE_NAMES}
+        total = sum(weights.values())
+        full = sum(self.weights.values())
+
+        if total == 0:
+            # Nothing left to blend: fall back to keyword matching alone
+            weights["keyword_match"] = full
+            return weights
+        return {name: weight * full / total for name, weight in weights.items()}
+
+    def weight_vector(self, available=FEATURE_NAMES):
+        """
+        Weights as a NumPy array in FEATURE_NAMES order
+        """
+        weights = self.weights_for(available)
+        return np.array([weights[name] for name in FEATURE_NAMES], dtype=float)
+
+    def combine(self, features, available=FEATURE_NAMES):
+        """
+        Blend a feature dict into a single score ratio (0 to 1)
+        """
+        weights = self.weights_for(available)
+        return sum(weights[name] * features[name] for name in FEATURE_NAMES)
+
+    def save(self, filename="trained_data/scoring_profile.json"):
+        """
+        Save profile to JSON file
+        """
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump({"weights": self.weights, "thresholds": self.thresholds}, f, indent=2)
+
+        print(f"\n✓ Scoring profile saved to: {filename}")
+
+    def load(self, filename="trained_data/scoring_profile.json"):
+        """
+        Load a calibrated profile, keeping defaults if none exists
+        """
+        if not os.path.exists(filename):
+            return False
+
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.weights = dict(DEFAULT_WEIGHTS)
+            self.weights.update(data.get("weights", {}))
+            self.thresholds = list(data.get("thresholds", DEFAULT_THRESHOLDS))
+            return True
+        except (OSError, ValueError):
+            print(f"✗ Could not load scoring profile from: {filename}")
+            return False
+
+
+def simplex_grid(n_features, step=0.05):
+    """
+    All non-negative weight vectors on a grid of `step` that sum to 1
+    """
+    n_steps = int(round(1 / step))
+    rows = [
+        combo + (n_steps - sum(combo),)
+        for combo in product(range(n_steps + 1), repeat=n_features - 1)
+        if sum(combo) <= n_steps
+    ]
+    return np.array(rows, dtype=float) / n_steps
+
+
+class WeightCalibrator:
+    """
+    Calibrates scoring weights against teacher-marked answers
+
+    Features are computed once per answer; every candidate weighting is
+    then scored with a single matrix product over the feature matrix.
+    """
+
+    def __init__(self, evaluator):
+        self.evaluator = evaluator
+
+    def load_marked_answers(self, csv_file):
+        """
+        Load marked answers from CSV
+
+        Required columns: model_answer, student_answer, teacher_marks, max_marks
+        Optional column: subject
+        Blank answers are kept as empty strings.
+        Raises ValueError if a column is missing or marks are not valid numbers
+        """
+        df = pd.read_csv(csv_file, keep_default_na=False)
+        if "subject" not in df.columns:
+            df["subject"] = "general"
+        
+        missing = [column for column in MARKED_COLUMNS if column not in df.columns]
+        if missing:
+            raise ValueError(f"marked answers file is missing column(s): {', '.join(missing)}")
+        
+        for column in ["teacher_marks", "max_marks"]:
+            df[column] = pd.to_numeric(df[column], errors="coerce")
+        
+        bad_rows = df.index[~(df["max_marks"] > 0) | ~(df["teacher_marks"] >= 0)]
+        if len(bad_rows):
+            rows = ", ".join(str(i + 2) for i in bad_rows[:5])
+            more = f" (+{len(bad_rows) - 5} more)" if len(bad_rows) > 5 else ""
+            raise ValueError(f"teacher_marks must be >= 0 and max_marks > 0 (CSV line(s) {rows}{more})")
+        
+        return df
+
+    def extract_features(self, marked_answers):
+        """
+        Build the (n_answers x n_features) matrix and teacher score ratios
+        """
+        model_cache = {}
+
+        features = np.zeros((len(marked_answers), len(FEATURE_NAMES)))
+        for i, row in enumerate(marked_answers.itertuples(index=False)):
+            subject = getattr(row, "subject", "general")
+
+            # Many students share a model answer, so prepare it once
+            key = (row.model_answer, subject)
+            if key not in model_cache:
+                model_cache[key] = self.evaluator.prepare_answer(row.model_answer, subject)
+            model_ids, model_keyword_ids, _ = model_cache[key]
+
+            student_ids, student_keyword_ids, _ = self.evaluator.prepare_answer(row.student_answer, subject)
+
+            feats = self.evaluator.compute_features(
+                model_ids, student_ids, model_keyword_ids, student_keyword_ids, subject
+            )
+            features[i] = [feats[name] for name in FEATURE_NAMES]
+
+        targets = (
+            marked_answers["teacher_marks"].to_numpy(dtype=float)
+            / marked_answers["max_marks"].to_numpy(dtype=float)
+        )
+        return features, np.clip(targets, 0.0, 1.0)
+
+    def fit_weights(self, features, targets, step=0.05):
+        """
+        Grid-search blend weights minimising mean squared error
+
+        Returns: (weights dict, rmse)
+        """
+        candidates = simplex_grid(features.shape[1], step)
+
+        # (n_answers x n_candidates) predictions in one product
+        predictions = features @ candidates.T
+        mse = np.mean((predictions - targets[:, None]) ** 2, axis=0)
+
+        best = int(np.argmin(mse))
+        weights = {name: round(float(w), 4) for name, w in zip(FEATURE_NAMES, candidates[best])}
+        return weights, float(np.sqrt(mse[best]))
+
+    def fit_thresholds(self, predicted, targets, bands=DEFAULT_THRESHOLDS, step=0.01):
+        """
+        Pick feedback cut-offs on predicted scores that best agree with
+        teacher score bands (e.g. teacher >= 80% means "Excellent")
+        """
+        grid = np.arange(0.0, 1.0 + step, step)
+        above = predicted[:, None] >= grid[None, :]
+
+        thresholds = []
+        for band in bands:
+            agreement = np.mean(above == (targets >= band)[:, None], axis=0)
+            thresholds.append(round(float(grid[int(np.argmax(agreement))]), 2))
+
+        # Keep bands ordered Excellent > Good > Average
+        return sorted(thresholds, reverse=True)
+
+    def calibrate(self, marked_answers, step=0.05):
+        """
+        Full calibration: features -> weights -> thresholds
+        """
+        print(f"\nComputing features for {len(marked_answers)} marked answers...")
+        features, targets = self.extract_features(marked_answers)
+
+        weights, rmse = self.fit_weights(features, targets, step=step)
+        profile = ScoringProfile(weights=weights)
+
+        predicted = features @ profile.weight_vector()
+        profile.thresholds = self.fit_thresholds(predicted, targets)
+
+        print(f"✓ Calibrated weights: {weights}")
+        print(f"✓ Feedback thresholds: {profile.thresholds}")
+        print(f"✓ RMSE against teacher marks: {rmse * 100:.1f}%")
+
+        return profile
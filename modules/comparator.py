@@ -1,6 +1,11 @@
+import numpy as np
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.feature_extraction.text import TfidfVectorizer
 
+# Smoothed IDF of a term found in only one of the two answers when
+# TfidfVectorizer is fitted on a (model, student) pair: ln(3/2) + 1
+UNSHARED_IDF = 1.0 + np.log(1.5)
+
 class AnswerComparator:
     """
     Compares student answer with model answer
@@ -39,6 +44,35 @@ class AnswerComparator:
         missing = model_words - student_words
         
         return list(matched), list(missing)
+    
+    def calculate_similarity_ids(self, model_ids, student_ids, dictionary):
+        """
+        Same similarity as calculate_similarity, computed directly from
+        TermDictionary id arrays without re-tokenizing
+        """
+        word_mask = dictionary.word_mask()
+        model_terms, model_counts = np.unique(model_ids[word_mask[model_ids]], return_counts=True)
+        student_terms, student_counts = np.unique(student_ids[word_mask[student_ids]], return_counts=True)
+        
+        # Terms in both answers get IDF 1, all others UNSHARED_IDF
+        model_shared = np.isin(model_terms, student_terms, assume_unique=True)
+        student_shared = np.isin(student_terms, model_terms, assume_unique=True)
+        
+        dot = float(model_counts[model_shared] @ student_counts[student_shared])
+        model_norm = np.linalg.norm(model_counts * np.where(model_shared, 1.0, UNSHARED_IDF))
+        student_norm = np.linalg.norm(student_counts * np.where(student_shared, 1.0, UNSHARED_IDF))
+        
+        if model_norm == 0 or student_norm == 0:
+            return 0.0
+        return dot / (model_norm * student_norm)
+    
+    def find_matched_keyword_ids(self, model_keyword_ids, student_keyword_ids):
+        """
+        Id-array version of find_matched_keywords
+        Output: matched ids, missing ids (in model keyword order)
+        """
+        present = np.isin(model_keyword_ids, student_keyword_ids)
+        return model_keyword_ids[present], model_keyword_ids[~present]
 
 
 # TEST THE COMPARATOR
@@ -1,52 +1,109 @@
-from keyword_extractor import KeywordExtractor
-from science_vocabulary import ScienceVocabularyBuilder
+import numpy as np
+from modules.keyword_extractor import KeywordExtractor
+from modules.science_vocabulary import ScienceVocabularyBuilder
 
 class EnhancedKeywordExtractor(KeywordExtractor):
     """
     Enhanced version that uses textbook-trained vocabulary
     """
     
-    def __init__(self, max_keywords=10, vocabulary_file="science_vocabulary.json"):
+    def __init__(self, max_keywords=10, vocabulary_file="trained_data/science_vocabulary.json",
+                 vocab_builder=None, max_boost=1.5):
         super().__init__(max_keywords)
-        self.vocab_builder = ScienceVocabularyBuilder()
+        self.max_boost = max_boost
+        self._subject_boosts = {}
         
-        # Try to load existing vocabulary
-        if not self.vocab_builder.load_vocabulary(vocabulary_file):
-            print("No vocabulary found. Will use standard extraction.")
+        # Share the evaluator's vocabulary if given, else load our own
+        if vocab_builder is not None:
+            self.vocab_builder = vocab_builder
+        else:
+            self.vocab_builder = ScienceVocabularyBuilder()
+            if not self.vocab_builder.load_vocabulary(vocabulary_file):
+                print("No vocabulary found. Will use standard extraction.")
     
-    def extract_keywords_with_boost(self, text, subject="general", top_n=None):
+    def subject_boosts(self, subject="general"):
         """
-        Extract keywords with boost for known science terms
+        Boost weight per textbook term, precomputed once per subject
+        
+        Weights scale with log textbook frequency (get_term_importance),
+        from 1.0 for unknown words up to max_boost for the most frequent term.
         """
-        # Get standard keywords
-        keywords = self.extract_keywords(text, top_n)
+        if subject not in self._subject_boosts:
+            terms = self.vocab_builder.vocabulary.get(subject, {})
+            importance = {term: self.vocab_builder.get_term_importance(term, subject) for term in terms}
+            top = max(importance.values(), default=0)
+            
+            boosts = {}
+            if top > 0:
+                scale = (self.max_boost - 1.0) / np.log1p(top)
+                boosts = {term: 1.0 + scale * np.log1p(freq) for term, freq in importance.items()}
+            self._subject_boosts[subject] = boosts
         
-        # Boost scores for known science terms
-        boosted_keywords = []
-        for word, score in keywords:
-            if self.vocab_builder.check_if_science_term(word, subject):
-                # Boost score by 50% for known science terms
-                boosted_score = score * 1.5
-                boosted_keywords.append((word, boosted_score))
-            else:
-                boosted_keywords.append((word, score))
+        return self._subject_boosts[subject]
+    
+    def extract_keyword_ids_with_boost_batch(self, id_arrays, dictionary, subject="general", top_n=None):
+        """
+        Boosted keywords for a batch of term-id arrays
         
-        # Re-sort by boosted scores
-        boosted_keywords.sort(key=lambda x: x[1], reverse=True)
+        Each answer is limited to max_keywords terms exactly as in
+        extract_keyword_ids; the boosts are then applied to the stacked
+        scores of the whole batch with one elementwise multiply.
+        Output: one (keyword ids, boosted scores) pair per answer
+        """
+        if top_n is None:
+            top_n = self.max_keywords
+        if not len(id_arrays):
+            return []
+        
+        boosts = self.subject_boosts(subject)
+        boost_vector = dictionary.aligned(("boost", subject, self.max_boost),
+                                          lambda term: boosts.get(term, 1.0))
+        
+        limited = [self._limit_features(ids, dictionary) for ids in id_arrays]
+        indptr = np.cumsum([0] + [len(terms) for terms, _, _ in limited])
+        terms = np.concatenate([terms for terms, _, _ in limited])
+        rank = np.concatenate([rank for _, _, rank in limited])
+        scores = np.concatenate([counts / np.sqrt(np.sum(counts ** 2)) for _, counts, _ in limited])
+        
+        scores = scores * boost_vector[terms]
+        
+        results = []
+        for start, end in zip(indptr[:-1], indptr[1:]):
+            order = start + np.lexsort((rank[start:end], -scores[start:end]))[:top_n]
+            results.append((terms[order], scores[order]))
+        return results
+    
+    def extract_keyword_ids_with_boost(self, ids, dictionary, subject="general", top_n=None):
+        """
+        Id-array version of extract_keywords_with_boost
+        Output: (keyword ids, boosted scores), highest score first
+        """
+        return self.extract_keyword_ids_with_boost_batch([ids], dictionary, subject, top_n)[0]
+    
+    def extract_keywords_with_boost(self, text, subject="general", top_n=None):
+        """
+        Extract keywords with boost for known science terms
+        """
+        if top_n is None:
+            top_n = self.max_keywords
         
-        return boosted_keywords[:top_n if top_n else self.max_keywords]
+        boosts = self.subject_boosts(subject)
+        keywords = [(word, score * boosts.get(word, 1.0))
+                    for word, score in self.extract_keywords(text, self.max_keywords)]
+        keywords.sort(key=lambda x: x[1], reverse=True)
+        return keywords[:top_n]
 
 
 # TEST
 if __name__ == "__main__":
-    from preprocessor import TextPreprocessor
+    from modules.preprocessor import TextPreprocessor
     
     preprocessor = TextPreprocessor()
     extractor = EnhancedKeywordExtractor()
     
     # Test answer
     answer = """
-    Photosynthesis is the process where plants convert light energy into 
+    Photosynthesis is the process where plants convert light energy into
     chemical energy. Chlorophyll in chloroplasts absorbs sunlight.
     """
     
@@ -58,10 +115,6 @@ if __name__ == "__main__":
         print(f"{word}: {score:.3f}")
     
     print("\n\nBOOSTED KEYWORDS (if vocabulary loaded):")
-    boosted = extractor.extract_keywords_with_boost(cleaned, subject="biology_grade10")
+    boosted = extractor.extract_keywords_with_boost(cleaned, subject="grade-10-science-part-i")
     for word, score in boosted:
         print(f"{word}: {score:.3f}")
-
-
-
-
@@ -0,0 +1,57 @@
+import math
+import hashlib
+import numpy as np
+
+
+class CountMinSketch:
+    """
+    Approximate term counts in fixed memory
+
+    Estimates never undercount. With probability 1 - delta, each estimate
+    exceeds the true count by at most epsilon * (total tokens added).
+    """
+
+    def __init__(self, epsilon=1e-5, delta=1e-3):
+        self.epsilon = epsilon
+        self.delta = delta
+        self.width = int(math.ceil(math.e / epsilon))
+        self.depth = int(math.ceil(math.log(1 / delta)))
+        self.table = np.zeros((self.depth, self.width), dtype=np.uint32)
+        self.total = 0
+
+    @property
+    def nbytes(self):
+        return self.table.nbytes
+
+    def _columns(self, items):
+        """
+        (depth x n_items) column of each item in every row, by double hashing
+        """
+        digests = b"".join(hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest() for item in items)
+        halves = np.frombuffer(digests, dtype=np.uint64).reshape(-1, 2)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return (halves[:, 0] + rows * (halves[:, 1] | np.uint64(1))) % np.uint64(self.width)
+
+    def add(self, counts):
+        """
+        Add a batch of {item: count}
+        """
+        if not counts:
+            return
+        items = list(counts)
+        values = np.fromiter(counts.values(), dtype=np.uint32, count=len(items))
+        columns = self._columns(items)
+        for row in range(self.depth):
+            np.add.at(self.table[row], columns[row], values)
+        self.total += int(values.sum())
+
+    def estimate(self, items):
+        """
+        Estimated counts for a list of items
+        """
+        if not items:
+            return np.zeros(0, dtype=np.int64)
+        columns = self._columns(items)
+        rows = np.arange(self.depth)[:, None]
+        return self.table[rows, columns].min(axis=0).astype(np.int64)
+
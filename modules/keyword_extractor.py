@@ -1,4 +1,5 @@
 from sklearn.feature_extraction.text import TfidfVectorizer
+import numpy as np
 import pandas as pd
 
 class KeywordExtractor:
@@ -42,6 +43,46 @@ class KeywordExtractor:
             # If text is too short or has issues
             return []
     
+    def _limit_features(self, ids, dictionary):
+        """
+        Unique terms of an id array and their counts, limited to the
+        max_keywords most frequent the way TfidfVectorizer(max_features)
+        does it: features in alphabetical order, then an (unstable)
+        argsort of the negated counts, so ties are kept exactly as sklearn
+        keeps them
+        Output: (term ids, counts, alphabetical ranks among these terms)
+        """
+        ids = ids[dictionary.word_mask()[ids]]
+        terms, counts = np.unique(ids, return_counts=True)
+        
+        # Only this answer's own terms need ordering, not the whole dictionary
+        alphabetical = np.argsort(np.array(dictionary.decode(terms), dtype=str), kind="stable")
+        terms, counts = terms[alphabetical], counts[alphabetical]
+        
+        keep = (-counts.astype(np.float64)).argsort()[:self.max_keywords]
+        return terms[keep], counts[keep], keep
+    
+    def extract_keyword_ids(self, ids, dictionary, top_n=None):
+        """
+        Same keywords as extract_keywords, from a TermDictionary id array
+        Output: (keyword ids, scores), highest score first
+        """
+        if top_n is None:
+            top_n = self.max_keywords
+        
+        terms, counts, rank = self._limit_features(ids, dictionary)
+        
+        # Single-document TF-IDF is the L2-normalised term frequency
+        scores = counts / np.sqrt(np.sum(counts ** 2)) if len(counts) else counts.astype(float)
+        order = np.lexsort((rank, -scores))[:top_n]
+        return terms[order], scores[order]
+    
+    def extract_keyword_ids_batch(self, id_arrays, dictionary, top_n=None):
+        """
+        extract_keyword_ids for a batch of term-id arrays
+        """
+        return [self.extract_keyword_ids(ids, dictionary, top_n) for ids in id_arrays]
+    
     def extract_keywords_from_multiple(self, texts, top_n=None):
         """
         Extract keywords from multiple texts
@@ -0,0 +1,226 @@
+import os
+import re
+import json
+import numpy as np
+from modules.preprocessor import TextPreprocessor
+from modules.pdf_extractor import PAGE_BREAK
+
+PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+
+
+class PassageIndex:
+    """
+    BM25 index over textbook paragraphs
+
+    Built offline from the *_extracted.txt files. Queries only touch the
+    postings of the question's terms, and suggested keywords come from a
+    precomputed per-passage term list, so no passage is re-tokenized.
+
+    On disk (index_dir/):
+        meta.json          - books, terms, BM25 parameters
+        *.npy              - postings, per-passage term lists, lengths and
+                             locations, memory-mapped on load
+        passages.txt       - passage text, addressed by byte offsets
+    """
+
+    ARRAYS = [
+        "term_offsets", "postings_passages", "postings_tf",
+        "passage_term_offsets", "passage_terms", "passage_tf",
+        "passage_lengths", "passage_books", "passage_pages", "text_offsets",
+    ]
+
+    def __init__(self, k1=1.5, b=0.75):
+        self.k1 = k1
+        self.b = b
+        self.preprocessor = None
+        self.books = []
+        self.terms = []
+        self.term_ids = {}
+        self.arrays = {}
+        self.avg_length = 0.0
+        self.text_file = None
+        self._text = b""
+
+    def _get_preprocessor(self):
+        if self.preprocessor is None:
+            self.preprocessor = TextPreprocessor()
+        return self.preprocessor
+
+    def build(self, book_texts, min_tokens=5):
+        """
+        Build the index from {book name: extracted text}
+        Passages are paragraphs (blank-line separated) of at least min_tokens terms
+        """
+        preprocessor = self._get_preprocessor()
+        self.books = sorted(book_texts)
+
+        passages, locations, token_lists = [], [], []
+        for book_id, book in enumerate(self.books):
+            for page_num, page_text in enumerate(book_texts[book].split(PAGE_BREAK), 1):
+                for paragraph in PARAGRAPH_BREAK.split(page_text):
+                    tokens = [t for t in preprocessor.preprocess(paragraph) if len(t) > 1]
+                    if len(tokens) >= min_tokens:
+                        passages.append(" ".join(paragraph.split()))
+                        locations.append((book_id, page_num))
+                        token_lists.append(tokens)
+
+        self.terms = sorted({token for tokens in token_lists for token in tokens})
+        self.term_ids = {term: i for i, term in enumerate(self.terms)}
+
+        # Forward index: sorted unique term ids and counts per passage
+        passage_terms, passage_tf, passage_term_offsets = [], [], [0]
+        for tokens in token_lists:
+            ids, counts = np.unique([self.term_ids[t] for t in tokens], return_counts=True)
+            passage_terms.append(ids)
+            passage_tf.append(counts)
+            passage_term_offsets.append(passage_term_offsets[-1] + len(ids))
+
+        flat_terms = np.concatenate(passage_terms).astype(np.uint32) if passages else np.zeros(0, np.uint32)
+        flat_tf = np.concatenate(passage_tf).astype(np.uint16) if passages else np.zeros(0, np.uint16)
+        flat_passages = np.repeat(np.arange(len(passages), dtype=np.uint32), np.diff(passage_term_offsets))
+
+        # Inverted index: the forward index regrouped by term
+        order = np.argsort(flat_terms, kind="stable")
+        term_offsets = np.zeros(len(self.terms) + 1, dtype=np.int64)
+        term_offsets[1:] = np.cumsum(np.bincount(flat_terms, minlength=len(self.terms)))
+
+        encoded = [p.encode("utf-8") for p in passages]
+        text_offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        text_offsets[1:] = np.cumsum([len(p) for p in encoded])
+        self._text = b"".join(encoded)
+
+        self.arrays = {
+            "term_offsets": term_offsets,
+            "postings_passages": flat_passages[order],
+            "postings_tf": flat_tf[order],
+            "passage_term_offsets": np.array(passage_term_offsets, dtype=np.int64),
+            "passage_terms": flat_terms,
+            "passage_tf": flat_tf,
+            "passage_lengths": np.array([len(t) for t in token_lists], dtype=np.uint32),
+            "passage_books": np.array([loc[0] for loc in locations], dtype=np.uint16),
+            "passage_pages": np.array([loc[1] for loc in locations], dtype=np.uint32),
+            "text_offsets": text_offsets,
+        }
+        self.avg_length = float(np.mean(self.arrays["passage_lengths"])) if passages else 0.0
+
+        print(f"✓ Indexed {len(passages)} passages, {len(self.terms)} terms")
+
+    def save(self, index_dir="trained_data/passage_index"):
+        """
+        Save the index to index_dir
+        """
+        os.makedirs(index_dir, exist_ok=True)
+        with open(os.path.join(index_dir, "meta.json"), 'w', encoding='utf-8') as f:
+            json.dump({"books": self.books, "terms": self.terms, "k1": self.k1, "b": self.b}, f)
+        for name in self.ARRAYS:
+            np.save(os.path.join(index_dir, f"{name}.npy"), self.arrays[name])
+        with open(os.path.join(index_dir, "passages.txt"), 'wb') as f:
+            f.write(self._text)
+
+        print(f"\n✓ Passage index saved to: {index_dir}")
+
+    def load(self, index_dir="trained_data/passage_index"):
+        """
+        Load a saved index; arrays stay on disk via memory maps
+        """
+        try:
+            with open(os.path.join(index_dir, "meta.json"), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            self.books = meta["books"]
+            self.terms = meta["terms"]
+            self.k1, self.b = meta["k1"], meta["b"]
+            self.term_ids = {term: i for i, term in enumerate(self.terms)}
+            self.arrays = {
+                name: np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode='r')
+                for name in self.ARRAYS
+            }
+            lengths = self.arrays["passage_lengths"]
+            self.avg_length = float(np.mean(lengths)) if len(lengths) else 0.0
+            self.text_file = os.path.join(index_dir, "passages.txt")
+            self._text = None
+            return True
+        except (OSError, ValueError, KeyError):
+            return False
+
+    @property
+    def n_passages(self):
+        return len(self.arrays["passage_lengths"]) if self.arrays else 0
+
+    def _idf(self, doc_freq):
+        return np.log1p((self.n_passages - doc_freq + 0.5) / (doc_freq + 0.5))
+
+    def passage_text(self, passage_id):
+        start, end = self.arrays["text_offsets"][passage_id:passage_id + 2]
+        if self._text is not None:
+            return self._text[start:end].decode("utf-8")
+        with open(self.text_file, 'rb') as f:
+            f.seek(int(start))
+            return f.read(int(end - start)).decode("utf-8")
+
+    def search(self, question, top_k=3):
+        """
+        Top-k passages for a question by BM25
+        Returns: list of (passage id, score), best first
+        """
+        if not self.n_passages:
+            return []
+
+        tokens = self._get_preprocessor().preprocess(question)
+        query_ids = sorted({self.term_ids[t] for t in tokens if t in self.term_ids})
+
+        lengths = self.arrays["passage_lengths"]
+        scores = np.zeros(self.n_passages)
+        offsets = self.arrays["term_offsets"]
+
+        for term_id in query_ids:
+            start, end = offsets[term_id], offsets[term_id + 1]
+            passages = self.arrays["postings_passages"][start:end]
+            tf = self.arrays["postings_tf"][start:end].astype(float)
+            norm = self.k1 * (1 - self.b + self.b * lengths[passages] / self.avg_length)
+            scores[passages] += self._idf(end - start) * tf * (self.k1 + 1) / (tf + norm)
+
+        top_k = min(top_k, self.n_passages)
+        best = np.argpartition(-scores, top_k - 1)[:top_k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+        return [(int(p), float(scores[p])) for p in best if scores[p] > 0]
+
+    def suggest_keywords(self, hits, top_n=10):
+        """
+        Terms that best characterise the retrieved passages (TF-IDF of
+        each passage, weighted by its BM25 score)
+        """
+        if not hits:
+            return []
+
+        offsets = self.arrays["passage_term_offsets"]
+        term_offsets = self.arrays["term_offsets"]
+        weights = {}
+        for passage_id, score in hits:
+            start, end = offsets[passage_id], offsets[passage_id + 1]
+            term_ids = np.asarray(self.arrays["passage_terms"][start:end], dtype=np.int64)
+            tf = self.arrays["passage_tf"][start:end].astype(float)
+            doc_freq = term_offsets[term_ids + 1] - term_offsets[term_ids]
+            for term_id, weight in zip(term_ids, score * tf * self._idf(doc_freq)):
+                weights[term_id] = weights.get(term_id, 0.0) + weight
+
+        ranked = sorted(weights.items(), key=lambda x: x[1], reverse=True)[:top_n]
+        return [self.terms[term_id] for term_id, _ in ranked]
+
+    def suggest(self, question, top_k=3, top_n=10):
+        """
+        Passages and keywords to seed a model answer for a question
+
+        Returns:
+            dict with passages (book, page, score, text) and keywords
+        """
+        hits = self.search(question, top_k)
+        passages = [
+            {
+                "book": self.books[int(self.arrays["passage_books"][p])],
+                "page": int(self.arrays["passage_pages"][p]),
+                "score": round(score, 3),
+                "text": self.passage_text(p),
+            }
+            for p, score in hits
+        ]
+        return {"passages": passages, "keywords": self.suggest_keywords(hits, top_n)}
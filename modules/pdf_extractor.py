@@ -1,7 +1,8 @@
-import PyPDF2
-import pdfplumber
 import os
 
+# Separates pages in extracted textbook text
+PAGE_BREAK = "\f"
+
 class PDFTextExtractor:
     """
     Extract text from science textbook PDFs
@@ -12,6 +13,10 @@ class PDFTextExtractor:
         Method 1: Using PyPDF2
         """
         try:
+            # Imported here so the index modules can use PAGE_BREAK
+            # without the PDF libraries installed
+            import PyPDF2
+            
             text = ""
             with open(pdf_path, 'rb') as file:
                 pdf_reader = PyPDF2.PdfReader(file)
@@ -21,7 +26,7 @@ class PDFTextExtractor:
                 
                 for page_num in range(total_pages):
                     page = pdf_reader.pages[page_num]
-                    text += page.extract_text() + "\n"
+                    text += page.extract_text() + "\n" + PAGE_BREAK
                     
                     # Progress indicator
                     if (page_num + 1) % 10 == 0:
@@ -38,6 +43,8 @@ class PDFTextExtractor:
         Method 2: Using pdfplumber (often better for complex PDFs)
         """
         try:
+            import pdfplumber
+            
             text = ""
             with pdfplumber.open(pdf_path) as pdf:
                 total_pages = len(pdf.pages)
@@ -45,7 +52,7 @@ class PDFTextExtractor:
                 print(f"Extracting {total_pages} pages from {os.path.basename(pdf_path)}...")
                 
                 for page_num, page in enumerate(pdf.pages):
-                    text += page.extract_text() + "\n"
+                    text += page.extract_text() + "\n" + PAGE_BREAK
                     
                     # Progress indicator
                     if (page_num + 1) % 10 == 0:
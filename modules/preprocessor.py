@@ -47,6 +47,12 @@ class TextPreprocessor:
         """
         tokens = self.preprocess(text)
         return ' '.join(tokens)
+    
+    def preprocess_to_ids(self, text, dictionary):
+        """
+        Returns cleaned tokens as an int32 array of TermDictionary ids
+        """
+        return dictionary.encode(self.preprocess(text))
 
 
 # TEST THE PREPROCESSOR
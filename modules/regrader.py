@@ -0,0 +1,321 @@
+import os
+import json
+import numpy as np
+from scipy.sparse import csr_matrix
+from modules.calibration import ScoringProfile, FEATURE_NAMES
+from modules.comparator import UNSHARED_IDF
+from modules.results import ResultTable
+
+
+def pair_similarity(student_counts, model_counts, model_extra_sq=0.0):
+    """
+    Cosine similarity of each student row against the model answer,
+    identical to AnswerComparator.calculate_similarity on each pair
+
+    student_counts: (n_students x n_terms) sparse term counts
+    model_counts: model term counts over the same terms
+    model_extra_sq: sum of squared counts of model terms outside those terms
+    """
+    model_present = (model_counts > 0).astype(float)
+    student_sq = student_counts.multiply(student_counts)
+    student_present = (student_counts > 0).astype(float)
+
+    # Shared terms get IDF 1 on both sides, all other terms UNSHARED_IDF
+    dot = student_counts @ model_counts
+    c2 = UNSHARED_IDF ** 2
+    student_norm_sq = c2 * np.asarray(student_sq.sum(axis=1)).ravel() - (c2 - 1) * (student_sq @ model_present)
+    model_total_sq = float(model_counts @ model_counts) + model_extra_sq
+    model_norm_sq = c2 * model_total_sq - (c2 - 1) * (student_present @ (model_counts ** 2))
+
+    denom = np.sqrt(np.maximum(student_norm_sq, 0) * np.maximum(model_norm_sq, 0))
+    similarity = np.zeros(student_counts.shape[0])
+    np.divide(dot, denom, out=similarity, where=denom > 0)
+    return similarity
+
+
+class IncrementalRegrader:
+    """
+    Grades many students against one model answer and re-grades cheaply
+
+    Student-side work (preprocessing to term ids, keywords) is done once
+    and cached. Changing the model answer, max_marks or the blend weights
+    only recomputes the model side and rescores every student with a few
+    sparse matrix products.
+    """
+
+    def __init__(self, evaluator, model_answer, subject="general", max_marks=10, model_keywords=None):
+        self.evaluator = evaluator
+        self.dictionary = evaluator.term_dictionary
+        self.subject = subject
+        self.max_marks = max_marks
+        self.fixed_model_keywords = model_keywords
+        self.profile = ScoringProfile(evaluator.profile.weights, evaluator.profile.thresholds)
+
+        # Per-student cached artifacts (TermDictionary id arrays)
+        self.student_ids = []
+        self.student_tokens = []
+        self.student_keywords = []
+
+        self._matrices = None
+        self.features = np.zeros((0, len(FEATURE_NAMES)))
+        self.scores = np.zeros(0)
+        self.available = list(FEATURE_NAMES)
+
+        self._set_model_answer(model_answer)
+
+    def _set_model_answer(self, model_answer):
+        self.model_answer = model_answer
+        self.model_tokens, self.model_keywords, _ = self.evaluator.prepare_answer(model_answer, self.subject)
+        if self.fixed_model_keywords is not None:
+            self.model_keywords = self.evaluator.encode_keywords(self.fixed_model_keywords)
+        textbook_mask = self.dictionary.subject_mask(self.evaluator.vocab_builder, self.subject)
+        self.textbook_terms = self.model_keywords[textbook_mask[self.model_keywords]]
+
+    def add_students(self, student_ids, answers):
+        """
+        Preprocess and cache student answers
+        Input: parallel lists of student ids and answer texts
+        Raises ValueError if the lists differ in length or a student id
+        repeats (within the batch or among students already added)
+        """
+        student_ids, answers = list(student_ids), list(answers)
+        if len(student_ids) != len(answers):
+            raise ValueError(f"got {len(student_ids)} student ids for {len(answers)} answers")
+
+        seen = set(self.student_ids)
+        repeated = []
+        for student_id in student_ids:
+            if student_id in seen:
+                repeated.append(student_id)
+            seen.add(student_id)
+        if repeated:
+            raise ValueError(f"repeated student id(s): {', '.join(map(str, dict.fromkeys(repeated)))}")
+
+        new_tokens = [self.evaluator.preprocessor.preprocess_to_ids(answer, self.dictionary)
+                      for answer in answers]
+
+        # Keywords after all new terms are added, so ids are final
+        new_keywords = self.evaluator.extract_keyword_ids_batch(new_tokens, self.subject)
+        for student_id, ids, (keyword_ids, _) in zip(student_ids, new_tokens, new_keywords):
+            self.student_ids.append(student_id)
+            self.student_tokens.append(ids)
+            self.student_keywords.append(keyword_ids)
+        self._matrices = None
+
+    def _build_matrices(self):
+        """
+        Sparse term-count and keyword matrices over all cached students
+        """
+        word_mask = self.dictionary.word_mask()
+        n_terms = len(self.dictionary)
+
+        def stack(rows, binary):
+            rows = [ids[word_mask[ids]] for ids in rows]
+            indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+            indptr[1:] = np.cumsum([len(ids) for ids in rows])
+            indices = np.concatenate(rows) if rows else np.zeros(0, dtype=np.int32)
+            matrix = csr_matrix((np.ones(len(indices)), indices, indptr), shape=(len(rows), n_terms))
+            matrix.sum_duplicates()
+            if binary:
+                matrix.data[:] = 1.0
+            return matrix
+
+        counts = stack(self.student_tokens, binary=False)
+        keywords = stack(self.student_keywords, binary=True)
+        lengths = np.array([len(ids) for ids in self.student_tokens], dtype=float)
+        self._matrices = (counts, keywords, lengths)
+
+    def _model_vector(self, ids, n_terms, binary=False):
+        """
+        Model term vector over the first n_terms ids, plus the squared
+        counts of model terms added to the dictionary after that
+        """
+        ids = ids[self.dictionary.word_mask()[ids]]
+        vector = np.bincount(ids, minlength=n_terms).astype(float)
+        if binary:
+            vector = np.minimum(vector, 1.0)
+        return vector[:n_terms], float(vector[n_terms:] @ vector[n_terms:])
+
+    def compute_similarity(self):
+        """
+        Similarity of every cached student to the model answer
+        """
+        if self._matrices is None:
+            self._build_matrices()
+        counts = self._matrices[0]
+        model_counts, model_extra_sq = self._model_vector(self.model_tokens, counts.shape[1])
+        return pair_similarity(counts, model_counts, model_extra_sq)
+
+    def compute_features(self, include_similarity=True):
+        """
+        Feature matrix (n_students x n_features) in FEATURE_NAMES order
+        (the similarity column is 0 when include_similarity is False)
+        """
+        if self._matrices is None:
+            self._build_matrices()
+        counts, keywords, lengths = self._matrices
+        n_terms = counts.shape[1]
+
+        similarity = self.compute_similarity() if include_similarity else np.zeros(len(lengths))
+
+        model_kw, _ = self._model_vector(self.model_keywords, n_terms, binary=True)
+        if len(self.model_keywords):
+            keyword_match = (keywords @ model_kw) / len(self.model_keywords)
+        else:
+            keyword_match = np.zeros(len(lengths))
+
+        if len(self.textbook_terms):
+            textbook, _ = self._model_vector(self.textbook_terms, n_terms, binary=True)
+            textbook_coverage = (keywords @ textbook) / len(self.textbook_terms)
+        else:
+            textbook_coverage = keyword_match
+
+        model_length = len(self.model_tokens)
+        if model_length:
+            length = np.minimum(lengths / model_length, 1.0)
+        else:
+            length = np.zeros(len(lengths))
+
+        columns = {
+            "similarity": similarity,
+            "keyword_match": keyword_match,
+            "textbook_coverage": textbook_coverage,
+            "length": length,
+        }
+        return np.column_stack([columns[name] for name in FEATURE_NAMES])
+
+    def grade(self, include_similarity=True):
+        """
+        Score every cached student
+        Without similarity, its weight is spread over the other features
+        Returns: array of marks, in the order students were added
+        """
+        self.features = self.compute_features(include_similarity)
+        self.available = [name for name in FEATURE_NAMES if include_similarity or name != "similarity"]
+        return self._score()
+
+    def add_similarity(self, similarity):
+        """
+        Fill in the similarity skipped by grade(include_similarity=False)
+        (e.g. from compute_similarity) and rescore
+        Returns: array of marks
+        """
+        self.features[:, FEATURE_NAMES.index("similarity")] = similarity
+        self.available = list(FEATURE_NAMES)
+        return self._score()
+
+    def _score(self):
+        score_ratios = self.features @ self.profile.weight_vector(self.available)
+        self.scores = np.round(score_ratios * self.max_marks, 2)
+        return self.scores
+
+    def results(self, feedback_renderer=None):
+        """
+        Full results of the last grade() as a columnar ResultTable
+        """
+        if len(self.scores) != len(self.student_ids):
+            self.grade()
+
+        score_ratios = self.features @ self.profile.weight_vector(self.available)
+        similarity = self.features[:, FEATURE_NAMES.index("similarity")]
+        if "similarity" not in self.available:
+            similarity = np.full(len(similarity), np.nan)
+        keyword_match = self.features[:, FEATURE_NAMES.index("keyword_match")]
+
+        # Model keyword columns of the student keyword matrix
+        keywords = self._matrices[1]
+        in_range = self.model_keywords < keywords.shape[1]
+        matched = np.zeros((len(self.student_ids), len(self.model_keywords)), dtype=bool)
+        matched[:, in_range] = keywords[:, self.model_keywords[in_range]].toarray() > 0
+
+        columns = {
+            "score": self.scores,
+            "max_marks": np.full(len(self.scores), self.max_marks, dtype=float),
+            "percentage": np.round(score_ratios * 100, 1),
+            "similarity": np.round(similarity * 100, 1),
+            "keyword_match": np.round(keyword_match * 100, 1),
+        }
+        return ResultTable(
+            columns, score_ratios, self.dictionary.decode(self.model_keywords), matched, ~matched,
+            ids={"student_id": self.student_ids}, feedback_renderer=feedback_renderer,
+        )
+
+    def regrade(self, model_answer=None, max_marks=None, weights=None, model_keywords=None):
+        """
+        Apply a change to the model side and rescore all students
+
+        Returns: list of dicts (student_id, old_score, new_score) for
+        students whose marks changed
+        """
+        old_scores = self.scores if len(self.scores) == len(self.student_ids) else self.grade()
+
+        if model_keywords is not None:
+            self.fixed_model_keywords = model_keywords
+        if model_answer is not None or model_keywords is not None:
+            self._set_model_answer(model_answer if model_answer is not None else self.model_answer)
+        if max_marks is not None:
+            self.max_marks = max_marks
+        if weights is not None:
+            self.profile.weights.update(weights)
+
+        new_scores = self.grade()
+
+        changed = np.flatnonzero(old_scores != new_scores)
+        return [
+            {
+                "student_id": self.student_ids[i],
+                "old_score": float(old_scores[i]),
+                "new_score": float(new_scores[i]),
+            }
+            for i in changed
+        ]
+
+    def save_artifacts(self, artifact_dir):
+        """
+        Save cached student artifacts so a later session can re-grade
+        without preprocessing the students again
+
+        artifact_dir/meta.json holds the student ids, subject and terms;
+        artifact_dir/ids.npz the concatenated token and keyword id arrays
+        """
+        os.makedirs(artifact_dir, exist_ok=True)
+        with open(os.path.join(artifact_dir, "meta.json"), 'w', encoding='utf-8') as f:
+            json.dump({
+                "student_ids": self.student_ids,
+                "subject": self.subject,
+                "terms": self.dictionary.terms,
+            }, f)
+
+        def flatten(rows):
+            offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+            offsets[1:] = np.cumsum([len(ids) for ids in rows])
+            values = np.concatenate(rows).astype(np.int32) if rows else np.zeros(0, dtype=np.int32)
+            return values, offsets
+
+        tokens, token_offsets = flatten(self.student_tokens)
+        keywords, keyword_offsets = flatten(self.student_keywords)
+        np.savez(os.path.join(artifact_dir, "ids.npz"), tokens=tokens, token_offsets=token_offsets,
+                 keywords=keywords, keyword_offsets=keyword_offsets)
+
+    def load_artifacts(self, artifact_dir):
+        """
+        Load student artifacts saved with save_artifacts
+        """
+        with open(os.path.join(artifact_dir, "meta.json"), 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        with np.load(os.path.join(artifact_dir, "ids.npz")) as arrays:
+            arrays = dict(arrays)
+
+        def split(values, offsets):
+            return np.split(values, offsets[1:-1]) if len(offsets) > 1 else []
+
+        # Map the saved ids onto this session's dictionary
+        mapping = self.dictionary.encode(meta["terms"])
+        self.student_ids = meta["student_ids"]
+        self.student_tokens = [mapping[ids] for ids in split(arrays["tokens"], arrays["token_offsets"])]
+        self.student_keywords = [mapping[ids] for ids in split(arrays["keywords"], arrays["keyword_offsets"])]
+        self.subject = meta["subject"]
+        self._set_model_answer(self.model_answer)
+        self._matrices = None
+        self.features = np.zeros((0, len(FEATURE_NAMES)))
+        self.scores = np.zeros(0)
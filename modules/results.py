@@ -0,0 +1,169 @@
+from bisect import bisect_right
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix, vstack
+from modules.stage_costs import STAGES
+
+# Numeric columns, in the order they appear in exported tables
+SCORE_COLUMNS = ["score", "max_marks", "percentage", "similarity", "keyword_match"]
+
+
+def keyword_matrix(rows, keyword_ids, n_keywords):
+    """
+    Boolean CSR matrix from one list of keyword ids per row
+    """
+    indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum([len(ids) for ids in rows])
+    indices = np.fromiter((keyword_ids[w] for ids in rows for w in ids), dtype=np.int32, count=indptr[-1])
+    data = np.ones(len(indices), dtype=bool)
+    return csr_matrix((data, indices, indptr), shape=(len(rows), n_keywords))
+
+
+class ResultTable:
+    """
+    Columnar evaluation results for a whole exam
+
+    Scores live in NumPy arrays, matched/missing keywords in boolean sparse
+    matrices over an interned keyword list, and feedback text is only
+    rendered when a row is accessed.
+    """
+
+    def __init__(self, columns, score_ratio, keywords, matched, missing,
+                 ids=None, feedback_renderer=None, stages_run=None):
+        self.columns = {name: np.asarray(columns[name], dtype=float) for name in SCORE_COLUMNS}
+        self.score_ratio = np.asarray(score_ratio, dtype=float)
+        self.keywords = np.asarray(keywords, dtype=object)
+        self.matched = csr_matrix(matched, dtype=bool)
+        self.missing = csr_matrix(missing, dtype=bool)
+        self.ids = {name: np.asarray(values) for name, values in (ids or {}).items()}
+        self.feedback_renderer = feedback_renderer
+        self.stages_run = list(STAGES if stages_run is None else stages_run)
+        # (row end, renderer) pairs when stacked tables render differently
+        # (e.g. per-subject study pages); None means feedback_renderer for all rows
+        self.renderer_segments = None
+
+    @classmethod
+    def from_keyword_lists(cls, columns, score_ratio, matched, missing, ids=None, feedback_renderer=None):
+        """
+        Build a table from per-row lists of matched/missing keyword strings,
+        interning each keyword once
+        """
+        keyword_ids = {}
+        for rows in (matched, missing):
+            for words in rows:
+                for word in words:
+                    keyword_ids.setdefault(word, len(keyword_ids))
+
+        keywords = list(keyword_ids)
+        return cls(
+            columns, score_ratio, keywords,
+            keyword_matrix(matched, keyword_ids, len(keywords)),
+            keyword_matrix(missing, keyword_ids, len(keywords)),
+            ids=ids, feedback_renderer=feedback_renderer,
+        )
+
+    @classmethod
+    def concat(cls, tables):
+        """
+        Stack several tables (e.g. one per question) into one
+        """
+        keyword_ids = {}
+        for table in tables:
+            for word in table.keywords:
+                keyword_ids.setdefault(word, len(keyword_ids))
+        n_keywords = len(keyword_ids)
+
+        def remap(matrix, table):
+            # Move each table's keyword columns into the shared keyword space
+            mapping = np.array([keyword_ids[w] for w in table.keywords], dtype=np.int32)
+            coo = matrix.tocoo()
+            return csr_matrix((coo.data, (coo.row, mapping[coo.col])), shape=(matrix.shape[0], n_keywords))
+
+        id_names = tables[0].ids.keys() if tables else []
+        stages_run = [stage for stage in STAGES if all(stage in t.stages_run for t in tables)]
+
+        segments, offset = [], 0
+        for table in tables:
+            segments.extend((offset + end, renderer) for end, renderer in table._segments())
+            offset += len(table)
+
+        stacked = cls(
+            {name: np.concatenate([t.columns[name] for t in tables]) for name in SCORE_COLUMNS},
+            np.concatenate([t.score_ratio for t in tables]),
+            list(keyword_ids),
+            vstack([remap(t.matched, t) for t in tables]),
+            vstack([remap(t.missing, t) for t in tables]),
+            ids={name: np.concatenate([t.ids[name] for t in tables]) for name in id_names},
+            feedback_renderer=tables[0].feedback_renderer if tables else None,
+            stages_run=stages_run,
+        )
+        if len({id(renderer) for _, renderer in segments}) > 1:
+            stacked.renderer_segments = segments
+        return stacked
+
+    def __len__(self):
+        return len(self.score_ratio)
+
+    def _segments(self):
+        return self.renderer_segments or [(len(self), self.feedback_renderer)]
+
+    def _row_keywords(self, matrix, i):
+        return [str(w) for w in self.keywords[matrix.indices[matrix.indptr[i]:matrix.indptr[i + 1]]]]
+
+    def matched_keywords(self, i):
+        return self._row_keywords(self.matched, i)
+
+    def missing_keywords(self, i):
+        return self._row_keywords(self.missing, i)
+
+    def feedback(self, i):
+        """
+        Render feedback text for one row on demand
+        """
+        renderer = self.feedback_renderer
+        if self.renderer_segments:
+            ends = [end for end, _ in self.renderer_segments]
+            renderer = self.renderer_segments[bisect_right(ends, i)][1]
+        if renderer is None:
+            return ""
+        return renderer(self.score_ratio[i], self.matched_keywords(i),
+                        self.missing_keywords(i), self.columns["max_marks"][i])
+
+    def __getitem__(self, i):
+        """
+        One row as a dict shaped like AnswerEvaluator.evaluate_answer's result
+        """
+        row = {name: values[i].item() for name, values in self.ids.items()}
+        row.update({name: float(self.columns[name][i]) for name in SCORE_COLUMNS})
+        row["matched_keywords"] = self.matched_keywords(i)
+        row["missing_keywords"] = self.missing_keywords(i)
+        row["feedback"] = self.feedback(i)
+        return row
+
+    def to_dataframe(self, include_keywords=False):
+        """
+        Export as a pandas DataFrame
+
+        Without keywords the numeric columns share memory with this table.
+        include_keywords adds ';'-joined keyword columns (copied strings).
+        """
+        data = dict(self.ids)
+        data.update(self.columns)
+        df = pd.DataFrame(data, copy=False)
+
+        if include_keywords:
+            df["matched_keywords"] = [";".join(self.matched_keywords(i)) for i in range(len(self))]
+            df["missing_keywords"] = [";".join(self.missing_keywords(i)) for i in range(len(self))]
+        return df
+
+    def to_csv(self, filename, include_keywords=True):
+        """
+        Save results to CSV
+        """
+        self.to_dataframe(include_keywords).to_csv(filename, index=False)
+
+    def to_parquet(self, filename, include_keywords=True):
+        """
+        Save results to Parquet (pandas uses pyarrow, listed in requirements.txt)
+        """
+        self.to_dataframe(include_keywords).to_parquet(filename, index=False)
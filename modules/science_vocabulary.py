@@ -1,6 +1,52 @@
 from modules.preprocessor import TextPreprocessor
+from modules.frequency_sketch import CountMinSketch
+import os
 import json
+import heapq
 from collections import Counter
+from operator import itemgetter
+
+
+def extracted_book_files(text_dir="trained_data", suffix="_extracted.txt"):
+    """
+    {book name: path} of the *_extracted.txt files written during training
+    """
+    return {
+        filename[:-len(suffix)]: os.path.join(text_dir, filename)
+        for filename in sorted(os.listdir(text_dir))
+        if filename.endswith(suffix)
+    }
+
+
+def read_extracted_books(text_dir="trained_data", suffix="_extracted.txt"):
+    """
+    {book name: extracted text}, read once and shared by the textbook
+    page index and the passage index
+    """
+    book_texts = {}
+    for book, path in extracted_book_files(text_dir, suffix).items():
+        with open(path, 'r', encoding='utf-8') as f:
+            book_texts[book] = f.read()
+    return book_texts
+
+
+def read_text_chunks(filenames, chunk_size=1 << 20):
+    """
+    Yield text from files in pieces of roughly chunk_size characters,
+    split on line boundaries so words are never cut
+    """
+    for filename in filenames:
+        with open(filename, 'r', encoding='utf-8') as f:
+            lines, size = [], 0
+            for line in f:
+                lines.append(line)
+                size += len(line)
+                if size >= chunk_size:
+                    yield "".join(lines)
+                    lines, size = [], 0
+            if lines:
+                yield "".join(lines)
+
 
 class ScienceVocabularyBuilder:
     """
@@ -37,6 +83,69 @@ class ScienceVocabularyBuilder:
         
         return science_terms
     
+    def build_vocabulary_bounded(self, text_chunks, subject="general", min_freq=3,
+                                 epsilon=1e-5, delta=1e-3, capacity=50000, exact_pass=True):
+        """
+        build_vocabulary_from_text in bounded memory
+        
+        text_chunks: function returning an iterable of text pieces
+                     (called a second time when exact_pass is True)
+        
+        Counts go into a count-min sketch (epsilon, delta). A word becomes a
+        candidate as soon as its sketch estimate reaches min_freq; since the
+        sketch never undercounts, every term with min_freq+ occurrences is
+        admitted. At most `capacity` candidates are kept: past that, the
+        ones with the lowest estimates are dropped.
+        
+        With exact_pass, the candidates are then counted exactly, so the
+        result equals build_vocabulary_from_text whenever no more than
+        `capacity` terms were admitted. Without it, counts are sketch
+        estimates, which may exceed the true count by epsilon * total tokens.
+        """
+        print(f"\nBuilding vocabulary for: {subject} (bounded memory)")
+        
+        sketch = CountMinSketch(epsilon, delta)
+        candidates = {}
+        pruned = False
+        
+        # Pass 1: approximate counts, one chunk in memory at a time
+        for chunk in text_chunks():
+            chunk_counts = Counter(word for word in self.preprocessor.preprocess(chunk) if len(word) > 3)
+            sketch.add(chunk_counts)
+            
+            words = list(chunk_counts)
+            for word, estimate in zip(words, sketch.estimate(words)):
+                if estimate >= min_freq:
+                    candidates[word] = int(estimate)
+            
+            if len(candidates) > capacity:
+                # Refresh stale estimates before choosing which to drop
+                words = list(candidates)
+                estimates = dict(zip(words, sketch.estimate(words).tolist()))
+                kept = heapq.nlargest(capacity, estimates.items(), key=itemgetter(1))
+                pruned = True
+                candidates = dict(kept)
+        
+        print(f"  {sketch.total:,} tokens, {len(candidates)} candidate terms "
+              f"(sketch {sketch.nbytes / 1e6:.1f} MB, max error {sketch.epsilon * sketch.total:.1f})")
+        if pruned:
+            print(f"  ⚠ More than {capacity} candidate terms; kept those with the highest estimates")
+        
+        # Pass 2: exact counts for the candidates only
+        if exact_pass:
+            exact = dict.fromkeys(candidates, 0)
+            for chunk in text_chunks():
+                for word in self.preprocessor.preprocess(chunk):
+                    if word in exact:
+                        exact[word] += 1
+            candidates = {word: freq for word, freq in exact.items() if freq >= min_freq}
+        
+        self.vocabulary[subject] = candidates
+        
+        print(f"✓ Found {len(candidates)} science terms")
+        
+        return candidates
+    
     def get_top_terms(self, subject, top_n=100):
         """
         Get most important terms from a subject
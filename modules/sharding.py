@@ -0,0 +1,173 @@
+import os
+import hashlib
+import numpy as np
+import pandas as pd
+from modules.results import ResultTable, SCORE_COLUMNS
+
+ID_COLUMNS = ["question_id", "student_id"]
+KEYWORD_COLUMNS = ["matched_keywords", "missing_keywords"]
+
+
+def shard_of(question_id, student_id, num_shards):
+    """
+    Shard number of one answer
+
+    Uses a fixed hash (not Python's salted hash()) so every machine
+    assigns the same answer to the same shard.
+    """
+    key = f"{question_id}\x1f{student_id}".encode("utf-8")
+    digest = hashlib.blake2b(key, digest_size=8).digest()
+    return int.from_bytes(digest, "big") % num_shards
+
+
+def shard_path(output_dir, shard, num_shards):
+    return os.path.join(output_dir, f"shard-{shard:05d}-of-{num_shards:05d}.csv")
+
+
+def load_exam(questions_file, answers_file):
+    """
+    Load an exam from CSV
+
+    questions_file columns: question_id, model_answer, subject (optional), max_marks (optional)
+    answers_file columns: question_id, student_id, student_answer
+    Raises ValueError if the files are inconsistent (see validate_exam)
+    """
+    ids = {"question_id": str, "student_id": str}
+    questions = pd.read_csv(questions_file, dtype={"question_id": str}, keep_default_na=False)
+    answers = pd.read_csv(answers_file, dtype=ids, keep_default_na=False)
+
+    if "subject" not in questions.columns:
+        questions["subject"] = "general"
+    if "max_marks" not in questions.columns:
+        questions["max_marks"] = 10
+
+    validate_exam(questions, answers)
+    questions["max_marks"] = questions["max_marks"].astype(float)
+    return questions.set_index("question_id"), answers
+
+
+def validate_exam(questions, answers):
+    """
+    Check an exam before any grading starts, so a bad row fails every
+    shard up front instead of losing one shard's work halfway through
+
+    Raises ValueError describing the first problem found.
+    """
+    def preview(values, limit=5):
+        values = list(dict.fromkeys(values))
+        more = f" (+{len(values) - limit} more)" if len(values) > limit else ""
+        return ", ".join(map(str, values[:limit])) + more
+
+    for name, frame, columns in [("questions", questions, ["question_id", "model_answer"]),
+                                 ("answers", answers, ["question_id", "student_id", "student_answer"])]:
+        missing = [column for column in columns if column not in frame.columns]
+        if missing:
+            raise ValueError(f"{name} file is missing column(s): {', '.join(missing)}")
+
+    duplicated = questions["question_id"][questions["question_id"].duplicated()]
+    if len(duplicated):
+        raise ValueError(f"duplicate question_id in questions file: {preview(duplicated)}")
+
+    max_marks = pd.to_numeric(questions["max_marks"], errors="coerce")
+    invalid = questions["question_id"][~(max_marks > 0)]
+    if len(invalid):
+        raise ValueError(f"max_marks must be a positive number for question(s): {preview(invalid)}")
+
+    repeated = answers[answers.duplicated(ID_COLUMNS)]
+    if len(repeated):
+        pairs = [f"{q}/{s}" for q, s in zip(repeated["question_id"], repeated["student_id"])]
+        raise ValueError(f"more than one answer for question_id/student_id: {preview(pairs)}")
+
+    unknown = answers["question_id"][~answers["question_id"].isin(questions["question_id"])]
+    if len(unknown):
+        raise ValueError(f"answers refer to question_id(s) not in the questions file: {preview(unknown)}")
+
+
+def partition(answers, num_shards):
+    """
+    Shard number for every answer row
+    """
+    return np.fromiter(
+        (shard_of(q, s, num_shards) for q, s in zip(answers["question_id"], answers["student_id"])),
+        dtype=np.int64, count=len(answers),
+    )
+
+
+def grade_shard(evaluator, questions, answers, shard, num_shards, output_dir):
+    """
+    Grade one shard and write its results
+
+    The file is written under a temporary name and renamed when complete,
+    so a shard file on the shared filesystem is always a finished one.
+    Returns: path of the shard's results file
+    """
+    part = answers[partition(answers, num_shards) == shard]
+
+    tables = []
+    for question_id, group in part.groupby("question_id", sort=True):
+        question = questions.loc[question_id]
+        table = evaluator.evaluate_batch(
+            question["model_answer"], group["student_answer"].tolist(),
+            subject=question["subject"], max_marks=question["max_marks"],
+            student_ids=group["student_id"].tolist(),
+        )
+        table.ids = {"question_id": np.full(len(group), question_id, dtype=object), **table.ids}
+        tables.append(table)
+
+    if tables:
+        results = ResultTable.concat(tables).to_dataframe(include_keywords=True)
+    else:
+        results = pd.DataFrame(columns=ID_COLUMNS + SCORE_COLUMNS + KEYWORD_COLUMNS)
+
+    os.makedirs(output_dir, exist_ok=True)
+    path = shard_path(output_dir, shard, num_shards)
+    results.to_csv(path + ".tmp", index=False)
+    os.replace(path + ".tmp", path)
+
+    print(f"✓ Shard {shard + 1}/{num_shards}: graded {len(part)} answers -> {path}")
+    return path
+
+
+def merge_shards(output_dir, num_shards):
+    """
+    Combine all shard outputs into one results table
+
+    Raises FileNotFoundError if any shard has not finished.
+    Returns: DataFrame sorted by question_id, student_id
+    """
+    paths = [shard_path(output_dir, shard, num_shards) for shard in range(num_shards)]
+    missing = [path for path in paths if not os.path.exists(path)]
+    if missing:
+        raise FileNotFoundError(f"{len(missing)} shard(s) not finished: {', '.join(missing)}")
+
+    ids = {"question_id": str, "student_id": str}
+    frames = [pd.read_csv(path, dtype=ids, keep_default_na=False) for path in paths]
+    results = pd.concat(frames, ignore_index=True)
+    return results.sort_values(ID_COLUMNS, kind="stable").reset_index(drop=True)
+
+
+def class_analytics(results, pass_percentage=40, top_missing=5):
+    """
+    Per-question class statistics from merged results
+    """
+    rows = []
+    for question_id, group in results.groupby("question_id", sort=True):
+        percentage = group["percentage"].astype(float)
+
+        missed = group["missing_keywords"].str.split(";").explode()
+        missed = missed[missed != ""].value_counts().head(top_missing)
+
+        rows.append({
+            "question_id": question_id,
+            "students": len(group),
+            "mean_score": round(group["score"].astype(float).mean(), 2),
+            "mean_percentage": round(percentage.mean(), 1),
+            "median_percentage": round(percentage.median(), 1),
+            "std_percentage": round(percentage.std(ddof=0), 1),
+            "min_percentage": percentage.min(),
+            "max_percentage": percentage.max(),
+            "pass_rate": round((percentage >= pass_percentage).mean() * 100, 1),
+            "most_missed_keywords": "; ".join(f"{word} ({count})" for word, count in missed.items()),
+        })
+
+    return pd.DataFrame(rows)
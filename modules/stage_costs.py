@@ -0,0 +1,122 @@
+import time
+from collections import deque
+from contextlib import contextmanager
+
+# Evaluation stages, cheapest first. "keywords" (preprocessing, exact keyword
+# match, textbook coverage, length) always runs; the rest are optional.
+STAGES = ["keywords", "similarity", "study_pages"]
+REQUIRED_STAGE = "keywords"
+
+# Seconds per answer assumed before any timings have been recorded
+DEFAULT_COSTS = {"keywords": 2e-3, "similarity": 5e-4, "study_pages": 1e-3}
+
+
+class StageCostModel:
+    """
+    Per-stage cost estimates learned from recent timings
+
+    Keeps an exponentially weighted moving average of seconds per answer
+    for each stage, so the estimate follows current load. A stage that is
+    skipped is never timed, so each skip decays its estimate toward the
+    fastest of its recent timings; one slow sample cannot switch a stage
+    off for good.
+    """
+
+    def __init__(self, alpha=0.2, defaults=None, history=20):
+        self.alpha = alpha
+        self.costs = dict(DEFAULT_COSTS)
+        if defaults:
+            self.costs.update(defaults)
+        self.defaults = dict(self.costs)
+        self.history = history
+        self.samples = {stage: 0 for stage in self.costs}
+        self.recent = {stage: deque(maxlen=history) for stage in self.costs}
+
+    def record(self, stage, seconds, n_items=1):
+        """
+        Record how long a stage took for n_items answers
+        """
+        per_item = seconds / max(n_items, 1)
+        if self.samples.get(stage, 0) == 0:
+            self.costs[stage] = per_item
+        else:
+            self.costs[stage] += self.alpha * (per_item - self.costs[stage])
+        self.samples[stage] = self.samples.get(stage, 0) + 1
+        self.recent.setdefault(stage, deque(maxlen=self.history)).append(per_item)
+
+    def skip(self, stage):
+        """
+        Record that a stage was skipped: move its estimate one EWMA step
+        toward its fastest recent timing (or its default if never timed)
+        """
+        recent = self.recent.get(stage)
+        floor = min(recent) if recent else self.defaults.get(stage, 0.0)
+        if self.costs.get(stage, 0.0) > floor:
+            self.costs[stage] += self.alpha * (floor - self.costs[stage])
+
+    def predict(self, stage, n_items=1):
+        """
+        Expected seconds for a stage on n_items answers
+        """
+        return self.costs.get(stage, 0.0) * n_items
+
+    def plan(self, time_budget, n_items=1, stages=STAGES):
+        """
+        Stages expected to fit in the budget, taken cheapest-first
+        """
+        if time_budget is None:
+            return list(stages)
+
+        planned, spent = [], 0.0
+        for stage in stages:
+            cost = self.predict(stage, n_items)
+            if stage == REQUIRED_STAGE or spent + cost <= time_budget:
+                planned.append(stage)
+                spent += cost
+        return planned
+
+
+class DeadlineTracker:
+    """
+    Runs the stages of one evaluation against a time budget
+
+    The plan is made up front from the cost model; before each optional
+    stage the remaining time is checked again, and each stage's actual
+    duration is fed back into the model.
+    """
+
+    def __init__(self, cost_model, time_budget=None, n_items=1, stages=STAGES):
+        self.cost_model = cost_model
+        self.time_budget = time_budget
+        self.n_items = n_items
+        self.stages = list(stages)
+        self.start = time.perf_counter()
+        self.planned = cost_model.plan(time_budget, n_items, self.stages)
+        self.stages_run = []
+
+    def remaining(self):
+        if self.time_budget is None:
+            return float("inf")
+        return self.time_budget - (time.perf_counter() - self.start)
+
+    def should_run(self, stage):
+        if stage == REQUIRED_STAGE:
+            return True
+        if stage in self.planned and self.cost_model.predict(stage, self.n_items) <= self.remaining():
+            return True
+        self.cost_model.skip(stage)
+        return False
+
+    @property
+    def degraded(self):
+        return len(self.stages_run) < len(self.stages)
+
+    @contextmanager
+    def run(self, stage):
+        """
+        Time a stage and record it as run
+        """
+        started = time.perf_counter()
+        yield
+        self.cost_model.record(stage, time.perf_counter() - started, self.n_items)
+        self.stages_run.append(stage)
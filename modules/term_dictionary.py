@@ -0,0 +1,87 @@
+import numpy as np
+
+
+class TermDictionary:
+    """
+    Shared term <-> integer id mapping
+
+    Seeded from the textbook vocabulary and extended on demand. Strings are
+    looked up once, during preprocessing; every later stage (term vectors,
+    keyword matching, vocabulary lookups) works on NumPy id arrays.
+
+    Ids are never reclaimed: every unseen token (e.g. a misspelling) adds a
+    term, so in a long-running process the dictionary and its aligned
+    arrays grow without bound. Recreate the evaluator periodically if that
+    matters.
+    """
+
+    def __init__(self, terms=()):
+        self.term_ids = {}
+        self.terms = []
+        self._aligned = {}
+        for term in terms:
+            self.add(term)
+
+    @classmethod
+    def from_vocabulary(cls, vocab_builder):
+        """
+        Dictionary holding every term of every trained subject
+        """
+        terms = set()
+        for subject_terms in vocab_builder.vocabulary.values():
+            terms.update(subject_terms)
+        return cls(sorted(terms))
+
+    def __len__(self):
+        return len(self.terms)
+
+    def add(self, term):
+        """
+        Id of a term, adding it if new
+        """
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            term_id = len(self.terms)
+            self.term_ids[term] = term_id
+            self.terms.append(term)
+        return term_id
+
+    def encode(self, tokens):
+        """
+        Token strings -> int32 id array (new tokens are added)
+        """
+        return np.fromiter((self.add(token) for token in tokens), dtype=np.int32, count=len(tokens))
+
+    def decode(self, ids):
+        """
+        Id array -> list of term strings
+        """
+        return [self.terms[i] for i in ids]
+
+    def aligned(self, key, value_fn, dtype=float):
+        """
+        Per-term array indexed by id, e.g. a subject's boost weights
+
+        Computed once with value_fn(term) and extended for terms added later.
+        """
+        values = self._aligned.get(key)
+        if values is None or len(values) < len(self.terms):
+            start = 0 if values is None else len(values)
+            new_values = np.fromiter((value_fn(term) for term in self.terms[start:]),
+                                     dtype=dtype, count=len(self.terms) - start)
+            values = new_values if values is None else np.concatenate((values, new_values))
+            self._aligned[key] = values
+        return values
+
+    def word_mask(self):
+        """
+        True for terms TfidfVectorizer would keep (two or more characters)
+        """
+        return self.aligned("word", lambda term: len(term) > 1, dtype=bool)
+
+    def subject_mask(self, vocab_builder, subject="general"):
+        """
+        True for ids that are textbook terms of a subject
+        """
+        terms = vocab_builder.vocabulary.get(subject, {})
+        return self.aligned(("subject", subject), lambda term: term in terms, dtype=bool)
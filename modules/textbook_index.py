@@ -0,0 +1,189 @@
+import os
+import json
+import numpy as np
+from modules.preprocessor import TextPreprocessor
+from modules.pdf_extractor import PAGE_BREAK
+
+
+def encode_varints(values):
+    """
+    Encode non-negative integers as LEB128 varint bytes
+    """
+    out = bytearray()
+    for value in values:
+        value = int(value)
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+    return bytes(out)
+
+
+def decode_varints(buf):
+    """
+    Decode a LEB128 varint byte buffer into an int64 array (vectorised)
+    """
+    data = np.asarray(buf, dtype=np.uint8)
+    if data.size == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    groups = np.repeat(np.arange(len(ends)), ends - starts + 1)
+    shifts = 7 * (np.arange(data.size) - starts[groups])
+
+    # Postings values stay far below 2**53, so float weights are exact
+    parts = (data & 0x7F).astype(np.float64) * np.exp2(shifts)
+    return np.bincount(groups, weights=parts, minlength=len(ends)).astype(np.int64)
+
+
+def segmented_cumsum(values, restart):
+    """
+    Cumulative sum that restarts wherever `restart` is True
+    """
+    totals = np.cumsum(values)
+    restart_at = np.maximum.accumulate(np.where(restart, np.arange(len(values)), 0))
+    return totals - totals[restart_at] + values[restart_at]
+
+
+class TextbookIndex:
+    """
+    Positional inverted index over extracted textbook text
+
+    Maps each preprocessed term to (book, page, offset) postings so feedback
+    can point students to the pages where a concept is explained.
+
+    On disk (index_dir/):
+        lexicon.json  - book names and term -> [byte start, byte length, postings]
+        postings.bin  - delta-encoded varint postings, memory-mapped on load
+    """
+
+    def __init__(self):
+        self.preprocessor = None
+        self.books = []
+        self.lexicon = {}
+        self.postings_data = np.zeros(0, dtype=np.uint8)
+        self._page_cache = {}
+
+    def build(self, book_texts):
+        """
+        Build the index from {book name: extracted text}
+        Pages are separated by PAGE_BREAK; offsets count preprocessed tokens
+        """
+        if self.preprocessor is None:
+            self.preprocessor = TextPreprocessor()
+
+        postings = {}
+        self.books = sorted(book_texts)
+
+        for book_id, book in enumerate(self.books):
+            pages = book_texts[book].split(PAGE_BREAK)
+            for page_num, page_text in enumerate(pages, 1):
+                tokens = self.preprocessor.preprocess(page_text)
+                for offset, term in enumerate(tokens):
+                    postings.setdefault(term, []).append((book_id, page_num, offset))
+
+        blob = bytearray()
+        self.lexicon = {}
+        for term in sorted(postings):
+            encoded = self._encode_postings(postings[term])
+            self.lexicon[term] = [len(blob), len(encoded), len(postings[term])]
+            blob.extend(encoded)
+
+        self.postings_data = np.frombuffer(bytes(blob), dtype=np.uint8)
+        self._page_cache = {}
+
+        print(f"✓ Indexed {len(self.lexicon)} terms across {len(self.books)} book(s)")
+
+    def _encode_postings(self, term_postings):
+        """
+        Delta-encode sorted (book, page, offset) triples:
+        book as a delta, page as a delta within the same book,
+        offset as a delta within the same page
+        """
+        values = []
+        prev_book, prev_page, prev_offset = 0, 0, 0
+        for book, page, offset in term_postings:
+            if book != prev_book:
+                values.extend((book - prev_book, page, offset))
+            elif page != prev_page:
+                values.extend((0, page - prev_page, offset))
+            else:
+                values.extend((0, 0, offset - prev_offset))
+            prev_book, prev_page, prev_offset = book, page, offset
+        return encode_varints(values)
+
+    def save(self, index_dir="trained_data/textbook_index"):
+        """
+        Save lexicon and postings to index_dir
+        """
+        os.makedirs(index_dir, exist_ok=True)
+        with open(os.path.join(index_dir, "lexicon.json"), 'w', encoding='utf-8') as f:
+            json.dump({"books": self.books, "terms": self.lexicon}, f)
+        self.postings_data.tofile(os.path.join(index_dir, "postings.bin"))
+
+        print(f"\n✓ Textbook index saved to: {index_dir}")
+
+    def load(self, index_dir="trained_data/textbook_index"):
+        """
+        Load a saved index; postings stay on disk via a memory map
+        """
+        try:
+            with open(os.path.join(index_dir, "lexicon.json"), 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.books = data["books"]
+            self.lexicon = data["terms"]
+
+            postings_file = os.path.join(index_dir, "postings.bin")
+            if os.path.getsize(postings_file) > 0:
+                self.postings_data = np.memmap(postings_file, dtype=np.uint8, mode='r')
+            else:
+                self.postings_data = np.zeros(0, dtype=np.uint8)
+            self._page_cache = {}
+            return True
+        except (OSError, ValueError, KeyError):
+            return False
+
+    def postings(self, term):
+        """
+        All occurrences of a term
+        Returns: (n x 3) int array of book id, page, offset
+        """
+        entry = self.lexicon.get(term)
+        if entry is None:
+            return np.zeros((0, 3), dtype=np.int64)
+
+        start, length, _ = entry
+        deltas = decode_varints(self.postings_data[start:start + length]).reshape(-1, 3)
+
+        new_book = deltas[:, 0] != 0
+        new_book[0] = True
+        new_page = new_book | (deltas[:, 1] != 0)
+
+        books = np.cumsum(deltas[:, 0])
+        pages = segmented_cumsum(deltas[:, 1], new_book)
+        offsets = segmented_cumsum(deltas[:, 2], new_page)
+        return np.column_stack((books, pages, offsets))
+
+    def find_pages(self, term, max_pages=3, book=None):
+        """
+        Pages that mention a term most often, optionally only in one book
+        Returns: list of (book name, page number) tuples
+        """
+        key = (term, max_pages, book)
+        if key not in self._page_cache:
+            found = self.postings(term)
+            if book is not None:
+                book_id = self.books.index(book) if book in self.books else -1
+                found = found[found[:, 0] == book_id]
+            pages = []
+            if len(found):
+                # One integer key per (book, page) keeps np.unique one-dimensional
+                page_keys, counts = np.unique((found[:, 0] << 32) | found[:, 1], return_counts=True)
+                # Most mentions first, earlier pages first on ties
+                for i in np.argsort(-counts, kind="stable")[:max_pages]:
+                    book_id, page = divmod(int(page_keys[i]), 1 << 32)
+                    pages.append((self.books[book_id], page))
+            self._page_cache[key] = pages
+
+        return self._page_cache[key]
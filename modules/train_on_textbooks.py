@@ -1,6 +1,10 @@
+import argparse
 import os
 from modules.pdf_extractor import PDFTextExtractor
-from modules.science_vocabulary import ScienceVocabularyBuilder
+from modules.science_vocabulary import (ScienceVocabularyBuilder, read_text_chunks,
+                                        extracted_book_files, read_extracted_books)
+from modules.textbook_index import TextbookIndex
+from modules.passage_retriever import PassageIndex
 
 def train_on_textbooks():
     """Extract text from all textbooks and build vocabulary"""
@@ -76,15 +80,79 @@ def train_on_textbooks():
     vocab_file = "trained_data/science_vocabulary.json"
     vocab_builder.save_vocabulary(vocab_file)
     
+    # Both indexes are built from the same extracted text, read once
+    book_texts = read_extracted_books("trained_data")
+    
+    # Index where each term appears so feedback can cite textbook pages
+    index_dir = "trained_data/textbook_index"
+    print("\nBuilding textbook page index...")
+    textbook_index = TextbookIndex()
+    textbook_index.build(book_texts)
+    textbook_index.save(index_dir)
+    
+    # Paragraph index for suggesting model answers from the textbooks
+    passage_index_dir = "trained_data/passage_index"
+    print("\nBuilding textbook passage index...")
+    passage_index = PassageIndex()
+    passage_index.build(book_texts)
+    passage_index.save(passage_index_dir)
+    
     print("\n\n" + "="*70)
     print("✅ TRAINING COMPLETE!")
     print("="*70)
     print(f"Vocabulary saved to: {vocab_file}")
+    print(f"Page index saved to: {index_dir}/")
+    print(f"Passage index saved to: {passage_index_dir}/")
     print(f"Processed {len(found_pdfs)} textbook(s)")
     print(f"\nExtracted text files saved in: trained_data/")
     
     if missing_pdfs:
         print(f"\n⚠ Note: {len(missing_pdfs)} textbook(s) not found")
 
+def train_bounded_memory(text_dir="trained_data", suffix="_extracted.txt", epsilon=1e-5, capacity=50000):
+    """
+    Rebuild vocabulary from extracted text files in fixed memory
+    
+    Each book is streamed in chunks through a count-min sketch instead of
+    an exact Counter, keeping at most `capacity` candidate terms, so
+    hundreds of books can be processed within a fixed RAM budget.
+    """
+    vocab_builder = ScienceVocabularyBuilder()
+    
+    print("="*70)
+    print("TRAINING ON EXTRACTED TEXT (BOUNDED MEMORY)")
+    print("="*70)
+    
+    text_files = extracted_book_files(text_dir, suffix)
+    if not text_files:
+        print(f"\n❌ No *{suffix} files found in '{text_dir}/'")
+        return
+    
+    for subject, path in text_files.items():
+        vocab_builder.build_vocabulary_bounded(lambda: read_text_chunks([path]),
+                                               subject=subject, epsilon=epsilon, capacity=capacity)
+    
+    vocab_file = os.path.join(text_dir, "science_vocabulary.json")
+    vocab_builder.save_vocabulary(vocab_file)
+    
+    print("\n" + "="*70)
+    print("✅ TRAINING COMPLETE!")
+    print("="*70)
+    print(f"Processed {len(text_files)} book(s)")
+
 if __name__ == "__main__":
-    train_on_textbooks()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train on science textbooks")
+    parser.add_argument("--bounded", action="store_true",
+                        help="rebuild the vocabulary from extracted text in fixed memory")
+    parser.add_argument("--epsilon", type=float, default=1e-5,
+                        help="count-min sketch error bound, as a fraction of all tokens (--bounded)")
+    parser.add_argument("--capacity", type=int, default=50000,
+                        help="most candidate terms kept per book (--bounded)")
+    args = parser.parse_args()
+    
+    if args.bounded:
+        if not 0 < args.epsilon < 1 or args.capacity < 1:
+            parser.error("--epsilon must be between 0 and 1 and --capacity at least 1")
+        train_bounded_memory(epsilon=args.epsilon, capacity=args.capacity)
+    else:
+        train_on_textbooks()
\ No newline at end of file
@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+from modules.calibration import WeightCalibrator
+
+
+def write_marked(path, **overrides):
+    rows = {
+        "model_answer": ["plants make glucose", "water boils at 100"],
+        "student_answer": ["plants make food", ""],
+        "teacher_marks": [6, 0],
+        "max_marks": [10, 5],
+    }
+    rows.update(overrides)
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return path
+
+
+def test_blank_answers_load_as_empty_strings(tmp_path):
+    marked = WeightCalibrator(None).load_marked_answers(write_marked(tmp_path / "marked.csv"))
+
+    assert marked["student_answer"].tolist() == ["plants make food", ""]
+    assert marked["subject"].tolist() == ["general", "general"]
+    assert marked["max_marks"].tolist() == [10, 5]
+
+
+def test_missing_column_is_reported(tmp_path):
+    path = tmp_path / "marked.csv"
+    write_marked(path)
+    pd.read_csv(path).drop(columns="teacher_marks").to_csv(path, index=False)
+
+    with pytest.raises(ValueError, match="teacher_marks"):
+        WeightCalibrator(None).load_marked_answers(path)
+
+
+@pytest.mark.parametrize("max_marks", [[10, 0], [10, ""], [10, "ten"]])
+def test_invalid_max_marks_is_reported(tmp_path, max_marks):
+    path = write_marked(tmp_path / "marked.csv", max_marks=max_marks)
+
+    with pytest.raises(ValueError, match="max_marks"):
+        WeightCalibrator(None).load_marked_answers(path)
@@ -0,0 +1,68 @@
+import math
+
+import pytest
+
+from modules.pdf_extractor import PAGE_BREAK
+from modules.passage_retriever import PassageIndex
+
+BOOKS = {
+    "grade10": PAGE_BREAK.join([
+        "Photosynthesis happens in the leaves of green plants using chlorophyll and light.\n\n"
+        "Plants release oxygen gas as a product of photosynthesis in sunlight.",
+        "Roots absorb water and minerals from the soil through tiny root hairs.",
+    ]),
+    "grade11": (
+        "Respiration releases energy from glucose inside the mitochondria of cells.\n\n"
+        "Enzymes speed up chemical reactions without being used up themselves."
+    ),
+}
+QUESTION = "How do plants use light and chlorophyll in photosynthesis?"
+
+
+@pytest.fixture
+def index(preprocessor):
+    index = PassageIndex()
+    index.preprocessor = preprocessor
+    index.build(BOOKS)
+    return index
+
+
+def brute_force_bm25(index, preprocessor, question):
+    """BM25 straight from the formula, re-tokenizing every passage"""
+    passages = [[t for t in preprocessor.preprocess(index.passage_text(p)) if len(t) > 1]
+                for p in range(index.n_passages)]
+    avg_length = sum(map(len, passages)) / len(passages)
+    scores = [0.0] * len(passages)
+    for term in set(preprocessor.preprocess(question)):
+        doc_freq = sum(term in tokens for tokens in passages)
+        if not doc_freq:
+            continue
+        idf = math.log(1 + (len(passages) - doc_freq + 0.5) / (doc_freq + 0.5))
+        for p, tokens in enumerate(passages):
+            tf = tokens.count(term)
+            norm = index.k1 * (1 - index.b + index.b * len(tokens) / avg_length)
+            scores[p] += idf * tf * (index.k1 + 1) / (tf + norm)
+    return scores
+
+
+def test_search_matches_bm25_formula(index, preprocessor):
+    expected = brute_force_bm25(index, preprocessor, QUESTION)
+    hits = index.search(QUESTION, top_k=index.n_passages)
+
+    ranked = sorted((p for p in range(index.n_passages) if expected[p] > 0), key=lambda p: -expected[p])
+    assert [p for p, _ in hits] == ranked
+    for p, score in hits:
+        assert score == pytest.approx(expected[p])
+
+
+def test_suggest_after_save_and_load(index, preprocessor, tmp_path):
+    index.save(str(tmp_path))
+    loaded = PassageIndex()
+    loaded.preprocessor = preprocessor
+    assert loaded.load(str(tmp_path))
+
+    suggestion = loaded.suggest(QUESTION, top_k=1, top_n=5)
+    assert suggestion == index.suggest(QUESTION, top_k=1, top_n=5)
+    assert suggestion["passages"][0]["book"] == "grade10"
+    assert suggestion["passages"][0]["page"] == 1
+    assert "chlorophyll" in suggestion["keywords"]
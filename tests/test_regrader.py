@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from modules.regrader import IncrementalRegrader
+
+MODEL = ("Photosynthesis is the process by which green plants convert light energy into chemical "
+         "energy. It occurs in chloroplasts using chlorophyll and produces glucose and oxygen.")
+STUDENTS = {
+    "S1": "Plants make food using sunlight. It happens in chloroplasts with chlorophyll.",
+    "S2": "Plants take carbon dioxide and water and make glucose and oxygen in the leaf.",
+    "S3": "Light energy becomes chemical energy in chloroplasts of green plants.",
+    "S4": "",
+    "S5": "Respiration releases energy from glucose in mitochondria.",
+}
+EDITED_MODEL = ("Photosynthesis converts light energy into chemical energy stored in glucose. "
+                "Stomata take in carbon dioxide and release oxygen; xylem brings water to the leaf.")
+LATE_STUDENTS = {"S6": "Stomata let carbon dioxide in, chlorophyll traps light, oxygen goes out."}
+
+
+def new_evaluator(tmp_path):
+    from answer_evaluator import AnswerEvaluator
+    return AnswerEvaluator(
+        vocabulary_file=str(tmp_path / "none.json"), profile_file=str(tmp_path / "none.json"),
+        index_dir=str(tmp_path / "none"), passage_index_dir=str(tmp_path / "none"),
+    )
+
+
+@pytest.fixture
+def evaluator(preprocessor, tmp_path, capsys):
+    evaluator = new_evaluator(tmp_path)
+    capsys.readouterr()
+    return evaluator
+
+
+def test_evaluate_batch_keeps_one_row_per_answer(evaluator):
+    results = evaluator.evaluate_batch(MODEL, list(STUDENTS.values()), student_ids=list(STUDENTS))
+    assert len(results) == len(STUDENTS)
+    assert results.ids["student_id"].tolist() == list(STUDENTS)
+
+
+@pytest.mark.parametrize("student_ids, answers, message", [
+    (["S1", "S1", "S2"], ["a", "b", "c"], "repeated student id"),
+    (["S1", "S2"], ["a", "b", "c"], "2 student ids for 3 answers"),
+])
+def test_evaluate_batch_rejects_bad_ids(evaluator, student_ids, answers, message):
+    with pytest.raises(ValueError, match=message):
+        evaluator.evaluate_batch(MODEL, answers, student_ids=student_ids)
+
+
+def test_add_students_rejects_ids_already_added(evaluator):
+    regrader = IncrementalRegrader(evaluator, MODEL)
+    regrader.add_students(["S1"], ["plants"])
+    with pytest.raises(ValueError, match="S1"):
+        regrader.add_students(["S2", "S1"], ["light", "water"])
+    assert regrader.student_ids == ["S1"]
+
+
+def fresh_scores(evaluator, model_answer, answers, max_marks):
+    return [evaluator.evaluate_answer(model_answer, answer, max_marks=max_marks, verbose=False)["score"]
+            for answer in answers.values()]
+
+
+def test_regrade_matches_fresh_evaluation(evaluator):
+    regrader = IncrementalRegrader(evaluator, MODEL, max_marks=10)
+    regrader.add_students(list(STUDENTS), list(STUDENTS.values()))
+    np.testing.assert_allclose(regrader.grade(), fresh_scores(evaluator, MODEL, STUDENTS, 10))
+
+    # New model terms, and a student added after grading
+    regrader.add_students(list(LATE_STUDENTS), list(LATE_STUDENTS.values()))
+    regrader.regrade(model_answer=EDITED_MODEL, max_marks=12)
+
+    expected = fresh_scores(evaluator, EDITED_MODEL, {**STUDENTS, **LATE_STUDENTS}, 12)
+    np.testing.assert_allclose(regrader.scores, expected)
+
+
+def test_artifacts_round_trip(evaluator, tmp_path):
+    regrader = IncrementalRegrader(evaluator, MODEL)
+    regrader.add_students(list(STUDENTS), list(STUDENTS.values()))
+    scores = regrader.grade()
+    regrader.save_artifacts(str(tmp_path / "artifacts"))
+
+    # A later session whose dictionary numbers terms differently
+    session = new_evaluator(tmp_path)
+    session.term_dictionary.encode(["zygote", "aardvark", "plant"])
+    loaded = IncrementalRegrader(session, MODEL)
+    loaded.load_artifacts(str(tmp_path / "artifacts"))
+
+    assert loaded.student_ids == list(STUDENTS)
+    np.testing.assert_allclose(loaded.grade(), scores)
+
+
+def test_batch_and_single_answer_costs_are_learned_separately(evaluator):
+    evaluator.evaluate_batch(MODEL, list(STUDENTS.values()), time_budget=10.0)
+    assert evaluator.batch_stage_costs.samples["keywords"] == 1
+    assert evaluator.stage_costs.samples["keywords"] == 0
+
+    evaluator.evaluate_answer(MODEL, STUDENTS["S1"], time_budget=10.0, verbose=False)
+    assert evaluator.stage_costs.samples["keywords"] == 1
+    assert evaluator.batch_stage_costs.samples["keywords"] == 1
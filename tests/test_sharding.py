@@ -0,0 +1,54 @@
+import pandas as pd
+import pytest
+
+from modules.sharding import load_exam, partition, shard_of
+
+
+def write_exam(tmp_path, questions=None, answers=None):
+    questions = questions if questions is not None else pd.DataFrame({
+        "question_id": ["Q1", "Q2"], "model_answer": ["plants make glucose", "water boils"],
+        "max_marks": ["10", "5"],
+    })
+    answers = answers if answers is not None else pd.DataFrame({
+        "question_id": ["Q1", "Q1", "Q2"], "student_id": ["S1", "S2", "S1"],
+        "student_answer": ["plants make food", "", "water boils at 100"],
+    })
+    questions.to_csv(tmp_path / "questions.csv", index=False)
+    answers.to_csv(tmp_path / "answers.csv", index=False)
+    return tmp_path / "questions.csv", tmp_path / "answers.csv"
+
+
+def test_load_exam_fills_defaults(tmp_path):
+    questions, answers = load_exam(*write_exam(tmp_path))
+
+    assert questions.loc["Q2", "max_marks"] == 5.0
+    assert questions.loc["Q1", "subject"] == "general"
+    assert answers["student_answer"].tolist()[1] == ""
+
+
+@pytest.mark.parametrize("change, message", [
+    (lambda q, a: q.assign(question_id=["Q1", "Q1"]), "duplicate question_id"),
+    (lambda q, a: q.assign(max_marks=["10", ""]), "max_marks"),
+    (lambda q, a: a.assign(question_id=["Q1", "Q1", "Q9"]), "Q9"),
+    (lambda q, a: a.assign(student_id=["S1", "S1", "S1"]), "Q1/S1"),
+    (lambda q, a: a.drop(columns="student_answer"), "student_answer"),
+])
+def test_load_exam_rejects_bad_files(tmp_path, change, message):
+    questions, answers = write_exam(tmp_path)
+    q, a = pd.read_csv(questions, dtype=str), pd.read_csv(answers, dtype=str, keep_default_na=False)
+    changed = change(q, a)
+    if "student_id" in changed.columns:
+        write_exam(tmp_path, answers=changed)
+    else:
+        write_exam(tmp_path, questions=changed)
+
+    with pytest.raises(ValueError, match=message):
+        load_exam(questions, answers)
+
+
+def test_partition_is_deterministic_and_covers_every_shard():
+    answers = pd.DataFrame({"question_id": ["Q1"] * 400, "student_id": [f"S{i}" for i in range(400)]})
+    shards = partition(answers, 4)
+
+    assert set(shards) == {0, 1, 2, 3}
+    assert shards.tolist() == [shard_of("Q1", f"S{i}", 4) for i in range(400)]
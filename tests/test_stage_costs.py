@@ -0,0 +1,32 @@
+from modules.stage_costs import StageCostModel, DeadlineTracker
+
+
+def run_similarity(model, time_budget):
+    tracker = DeadlineTracker(model, time_budget)
+    with tracker.run("keywords"):
+        pass
+    if tracker.should_run("similarity"):
+        with tracker.run("similarity"):
+            pass
+    return "similarity" in tracker.stages_run
+
+
+def test_one_slow_sample_does_not_disable_a_stage():
+    model = StageCostModel()
+    for _ in range(10):
+        model.record("similarity", 2e-4)
+    model.record("similarity", 0.2)
+    assert model.predict("similarity") > 0.02
+
+    runs = [run_similarity(model, time_budget=0.02) for _ in range(1000)]
+    assert sum(runs) > 900
+    assert model.predict("similarity") < 1e-3
+
+
+def test_genuinely_slow_stage_stays_skipped():
+    model = StageCostModel()
+    for _ in range(20):
+        model.record("similarity", 0.05)
+
+    runs = [run_similarity(model, time_budget=0.02) for _ in range(100)]
+    assert not any(runs)
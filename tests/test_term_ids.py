@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from modules.comparator import AnswerComparator
+from modules.keyword_extractor import KeywordExtractor
+from modules.term_dictionary import TermDictionary
+
+# Small vocabulary so answers share terms and have many tied counts;
+# one-letter tokens are dropped by TfidfVectorizer and must be here too
+WORDS = [
+    "photosynthesis", "chlorophyll", "chloroplast", "glucose", "chemical", "energy",
+    "light", "oxygen", "carbon", "dioxide", "water", "plant", "leaf", "root", "stem",
+    "sun", "cell", "food", "starch", "stomata", "xylem", "phloem", "enzyme", "acid",
+    "base", "salt", "atom", "ion", "x", "a",
+]
+
+
+def random_answers(n, seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(n):
+        size = rng.integers(1, 40)
+        yield [WORDS[i] for i in rng.integers(0, len(WORDS), size)]
+
+
+@pytest.mark.parametrize("max_keywords", [5, 15])
+def test_keyword_ids_match_tfidf_vectorizer(max_keywords):
+    dictionary = TermDictionary(sorted(WORDS, reverse=True))
+    extractor = KeywordExtractor(max_keywords=max_keywords)
+
+    for tokens in random_answers(3000, seed=max_keywords):
+        expected = extractor.extract_keywords(" ".join(tokens))
+        ids, scores = extractor.extract_keyword_ids(dictionary.encode(tokens), dictionary)
+
+        assert dictionary.decode(ids) == [word for word, _ in expected]
+        np.testing.assert_allclose(scores, [score for _, score in expected])
+
+
+def test_similarity_ids_match_tfidf_vectorizer():
+    dictionary = TermDictionary()
+    comparator = AnswerComparator()
+    answers = list(random_answers(2000, seed=0))
+
+    for model_tokens, student_tokens in zip(answers[::2], answers[1::2]):
+        expected = comparator.calculate_similarity(" ".join(model_tokens), " ".join(student_tokens))
+        similarity = comparator.calculate_similarity_ids(
+            dictionary.encode(model_tokens), dictionary.encode(student_tokens), dictionary,
+        )
+        assert similarity == pytest.approx(expected)
+
+
+@pytest.fixture(scope="module")
+def vocab_builder():
+    from modules.science_vocabulary import ScienceVocabularyBuilder
+    try:
+        builder = ScienceVocabularyBuilder()
+    except LookupError:
+        pytest.skip("NLTK data not installed (run setup_nltk.py)")
+    builder.vocabulary = {"biology": {"glucose": 40, "chlorophyll": 12, "leaf": 3}}
+    return builder
+
+
+def test_boost_without_subject_vocabulary_matches_plain_keywords(vocab_builder):
+    from modules.enhanced_keyword_extractor import EnhancedKeywordExtractor
+
+    dictionary = TermDictionary()
+    plain = KeywordExtractor(max_keywords=15)
+    boosted = EnhancedKeywordExtractor(max_keywords=15, vocab_builder=vocab_builder)
+
+    for tokens in random_answers(500, seed=1):
+        ids = dictionary.encode(tokens)
+        expected_ids, expected_scores = plain.extract_keyword_ids(ids, dictionary)
+        keyword_ids, scores = boosted.extract_keyword_ids_with_boost(ids, dictionary, subject="chemistry")
+
+        np.testing.assert_array_equal(keyword_ids, expected_ids)
+        np.testing.assert_allclose(scores, expected_scores)
+
+
+def test_boosted_batch_matches_single_answers(vocab_builder):
+    from modules.enhanced_keyword_extractor import EnhancedKeywordExtractor
+
+    dictionary = TermDictionary()
+    extractor = EnhancedKeywordExtractor(max_keywords=15, vocab_builder=vocab_builder)
+    id_arrays = [dictionary.encode(tokens) for tokens in random_answers(500, seed=2)]
+    id_arrays.append(np.zeros(0, dtype=np.int32))
+
+    batch = extractor.extract_keyword_ids_with_boost_batch(id_arrays, dictionary, subject="biology")
+    for ids, (keyword_ids, scores) in zip(id_arrays, batch):
+        expected_ids, expected_scores = extractor.extract_keyword_ids_with_boost_batch(
+            [ids], dictionary, subject="biology")[0]
+        np.testing.assert_array_equal(keyword_ids, expected_ids)
+        np.testing.assert_allclose(scores, expected_scores)
@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from modules.pdf_extractor import PAGE_BREAK
+from modules.textbook_index import TextbookIndex, decode_varints, encode_varints, segmented_cumsum
+
+
+@pytest.mark.parametrize("values", [
+    [],
+    [0],
+    [127, 128, 255, 16383, 16384],
+    [2 ** 32, 2 ** 40 + 5, 1],
+])
+def test_varints_round_trip(values):
+    buf = np.frombuffer(encode_varints(values), dtype=np.uint8)
+    assert decode_varints(buf).tolist() == values
+
+
+def test_varints_round_trip_random():
+    values = np.random.default_rng(0).integers(0, 2 ** 31, size=5000)
+    buf = np.frombuffer(encode_varints(values), dtype=np.uint8)
+    np.testing.assert_array_equal(decode_varints(buf), values)
+
+
+def test_segmented_cumsum_restarts():
+    rng = np.random.default_rng(1)
+    values = rng.integers(0, 10, size=1000)
+    restart = rng.random(1000) < 0.1
+    restart[0] = True
+
+    expected, total = [], 0
+    for value, new_segment in zip(values, restart):
+        total = value if new_segment else total + value
+        expected.append(total)
+
+    np.testing.assert_array_equal(segmented_cumsum(values, restart), expected)
+
+
+@pytest.fixture
+def index(preprocessor):
+    index = TextbookIndex()
+    index.preprocessor = preprocessor
+    index.build({
+        "grade10": PAGE_BREAK.join(["Plants make glucose.", "Chlorophyll absorbs light.", "Glucose glucose."]),
+        "grade11": PAGE_BREAK.join(["Glucose is a sugar.", "Atoms form ions."]),
+    })
+    return index
+
+
+def test_postings_decode_book_page_offset(index, preprocessor):
+    offset = preprocessor.preprocess("Plants make glucose.").index("glucose")
+    postings = index.postings("glucose").tolist()
+    assert postings == [[0, 1, offset], [0, 3, 0], [0, 3, 1], [1, 1, 0]]
+
+
+def test_find_pages_ranks_pages_and_filters_by_book(index):
+    assert index.find_pages("glucose") == [("grade10", 3), ("grade10", 1), ("grade11", 1)]
+    assert index.find_pages("glucose", book="grade11") == [("grade11", 1)]
+    assert index.find_pages("glucose", book="unknown") == []
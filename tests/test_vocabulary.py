@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from modules.science_vocabulary import read_text_chunks
+
+WORDS = [
+    "photosynthesis", "chlorophyll", "chloroplast", "glucose", "oxygen", "carbon",
+    "dioxide", "water", "plant", "leaf", "root", "stem", "starch", "stomata",
+    "xylem", "phloem", "enzyme", "acid", "base", "salt", "atom", "molecule",
+]
+
+
+@pytest.fixture
+def builder(preprocessor):
+    from modules.science_vocabulary import ScienceVocabularyBuilder
+    return ScienceVocabularyBuilder()
+
+
+@pytest.fixture
+def textbook(tmp_path):
+    # Zipf-like frequencies so some words fall below min_freq
+    rng = np.random.default_rng(0)
+    weights = 1 / np.arange(1, len(WORDS) + 1) ** 2
+    lines = [
+        " ".join(WORDS[i] for i in rng.choice(len(WORDS), 8, p=weights / weights.sum())) + "."
+        for _ in range(150)
+    ]
+    path = tmp_path / "book_extracted.txt"
+    path.write_text("\n".join(lines), encoding="utf-8")
+    return path
+
+
+def test_bounded_vocabulary_matches_exact_vocabulary(builder, textbook):
+    expected = builder.build_vocabulary_from_text(textbook.read_text(encoding="utf-8"))
+    vocabulary = builder.build_vocabulary_bounded(lambda: read_text_chunks([textbook], chunk_size=200),
+                                                  epsilon=0.01, capacity=len(WORDS))
+
+    assert 0 < len(expected) < len(WORDS)
+    assert vocabulary == expected
+
+
+def test_bounded_vocabulary_without_exact_pass_only_overcounts(builder, textbook):
+    expected = builder.build_vocabulary_from_text(textbook.read_text(encoding="utf-8"))
+    vocabulary = builder.build_vocabulary_bounded(lambda: read_text_chunks([textbook], chunk_size=200),
+                                                  epsilon=0.01, exact_pass=False)
+
+    assert set(expected) <= set(vocabulary)
+    assert all(vocabulary[word] >= freq for word, freq in expected.items())
+
+
+def test_bounded_vocabulary_keeps_most_frequent_terms_at_capacity(builder, textbook):
+    expected = builder.build_vocabulary_from_text(textbook.read_text(encoding="utf-8"))
+    vocabulary = builder.build_vocabulary_bounded(lambda: read_text_chunks([textbook], chunk_size=200),
+                                                  epsilon=1e-4, capacity=3)
+
+    assert vocabulary == dict(sorted(expected.items(), key=lambda item: -item[1])[:3])
@@ -1,6 +1,8 @@
 import os
 from modules.pdf_extractor import PDFTextExtractor
-from modules.science_vocabulary import ScienceVocabularyBuilder
+from modules.science_vocabulary import ScienceVocabularyBuilder, read_extracted_books
+from modules.textbook_index import TextbookIndex
+from modules.passage_retriever import PassageIndex
 
 extractor = PDFTextExtractor()
 vocab_builder = ScienceVocabularyBuilder()
@@ -48,9 +50,26 @@ for pdf_file in pdf_files:
 
 vocab_builder.save_vocabulary("trained_data/science_vocabulary.json")
 
+# Both indexes are built from the same extracted text, read once
+book_texts = read_extracted_books("trained_data")
+
+# Index where each term appears so feedback can cite textbook pages
+print("\nBuilding textbook page index...")
+textbook_index = TextbookIndex()
+textbook_index.build(book_texts)
+textbook_index.save("trained_data/textbook_index")
+
+# Paragraph index for suggesting model answers from the textbooks
+print("\nBuilding textbook passage index...")
+passage_index = PassageIndex()
+passage_index.build(book_texts)
+passage_index.save("trained_data/passage_index")
+
 print("\n" + "="*70)
 print("✅ TRAINING COMPLETE!")
 print("="*70)
 print(f"Processed {len(pdf_files)} textbooks")
 print("Vocabulary saved to: trained_data/science_vocabulary.json")
+print("Page index saved to: trained_data/textbook_index/")
+print("Passage index saved to: trained_data/passage_index/")
 print("\nYou can now use this vocabulary for accurate keyword matching!")
\ No newline at end of file